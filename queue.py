@@ -16,8 +16,17 @@ __author__ = "Steven Yulong Yan"
 # ------ Imported Modules ------ #
 
 
+import os
 import time
-import random
+from collections import namedtuple
+
+from queue_core import AlreadyQueuedError, InAnotherQueueError, NO_STUDENTS, QuestionQueue, QueueRegistry, name_problem
+from queue_game import DoubleGame, SingleGame, TARGET_DIAMETER, TICK
+from queue_history import HistoryStore
+from queue_log import QueueLog
+from queue_metrics import Metrics, QueueMetrics
+from queue_profile import Profiler
+from queue_server import QueueClient, RemoteQuestionQueue
 
 try:
     from tkinter import *
@@ -30,7 +39,6 @@ except ImportError:
 
 
 root = Tk()
-root.geometry("1140x690")
 root.resizable(0, 0)  # The window is set to be not resizable.
 root.title("Programming Class Queue")
 
@@ -41,109 +49,114 @@ root.title("Programming Class Queue")
 WINFO_WIDTH = 1140
 WINFO_HEIGHT = 690
 REFRESH_PERIOD = 3
-TARGET_DIAMETER = 20
-left_hit = False
-right_hit = False
-bottom_hit = False
-left_win = False
-right_win = False
-quick_precise_timing = False
-long_precise_timing = False
-quick_game_temp = None
-quick_game_continue = False
-long_game_temp = None
-long_game_continue = False
-quick_average = StringVar()
-quick_average.set("No students in queue.")
-long_average = StringVar()
-long_average.set("No students in queue.")
-
-
-# ------ Accessible Functions ------ #
+# The optional SQLite database archiving every accepted and cancelled request, set with CLASS_QUEUE_HISTORY
+HISTORY_PATH = os.environ.get("CLASS_QUEUE_HISTORY")
+# The host:port of a queue server to share the queues with, set with CLASS_QUEUE_SERVER
+SERVER_ADDRESS = os.environ.get("CLASS_QUEUE_SERVER")
+RECEIVE_PERIOD = 100  # The number of milliseconds between two checks for changes pushed by the queue server
+# The file the metrics are written to in the Prometheus text format, set with CLASS_QUEUE_METRICS
+METRICS_PATH = os.environ.get("CLASS_QUEUE_METRICS")
+# The port the metrics are served on over HTTP on the loopback interface, set with CLASS_QUEUE_METRICS_PORT
+METRICS_PORT = os.environ.get("CLASS_QUEUE_METRICS_PORT")
+METRICS_PERIOD = 15000  # The number of milliseconds between two writes of the metrics file
+# The directory profiling reports are written to, setting it with CLASS_QUEUE_PROFILE switches profiling on
+PROFILE_PATH = os.environ.get("CLASS_QUEUE_PROFILE")
+PROFILE_PERIOD = 60000  # The number of milliseconds covered by each profiling report
+ROW_HEIGHT = 30
+ROW_OVERSCAN = 2  # The number of rows kept ready above and below the visible part of a queue
+SELECTED_COLOUR = "#fcf8e3"  # The background of the rows selected for a batch
+COLUMN_WIDTH = 530  # The width of the column of each question queue
+COLUMN_SPACING = 570  # The distance between the left edges of two neighbouring columns
+BATCH_HEIGHT = 30  # The height of the bar of batch buttons, added to the window so the queues keep their rows
+GAME_LAG_LIMIT = 0.25  # The most seconds a game catches up on after a stall, beyond which it slows down instead
+
+
+def positive_setting(variable, default):
+    """
+    Read a positive whole number from an environment variable, falling back to a default if it is unset or invalid.
+    :param variable (str): The name of the environment variable
+    :param default (int): The value used if the variable is unset or does not hold a positive whole number
+    :return (int): The setting
+    """
+    text = os.environ.get(variable)
+    if text is None:
+        return default
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value > 0:
+        return value
+    print("{} must be a positive whole number, {} is used instead of {!r}.".format(variable, default, text))
+    return default
 
 
-def get_row(frame):
+def default_log_path():
     """
-    Return the row number of the given frame.
-    :param frame: The frame from which the row information retrieves
-    :return (int): The row number of the frame
+    Return the path of the log next to queue.py, or in the data directory of the user if queue.py is installed
+    where the user cannot write.
+    :return (str): The path of the log
     """
-    return frame.grid_info()["row"]
+    directory = os.path.dirname(os.path.abspath(__file__))
+    if not os.access(directory, os.W_OK):
+        data = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        directory = os.path.join(data, "class_queue")
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            # The log cannot be opened, which disables it at startup.
+            pass
+    return os.path.join(directory, "class_queue.log")
 
 
-def frame_quick_configure(event):
-    """
-    Configure the canvas within which the scrollbar is attached to
-    the frame for the quick queue.
-    """
-    canvas_quick_queue.config(scrollregion=canvas_quick_queue.bbox("all"))
+# The log the queues are saved to, which may be moved with the CLASS_QUEUE_LOG environment variable
+LOG_PATH = os.environ.get("CLASS_QUEUE_LOG") or default_log_path()
+# The number of frames per second the games are drawn at, which may be lowered with CLASS_QUEUE_GAME_FPS
+GAME_FPS = positive_setting("CLASS_QUEUE_GAME_FPS", 60)
+GAME_STEP = 1 / GAME_FPS  # The number of seconds simulated by one step of a game, as the moves are swept
 
 
-def frame_long_configure(event):
+# ------ Accessible Functions ------ #
+
+
+def close():
     """
-    Configure the canvas within which the scrollbar is attached to
-    the frame for the long queue.
+    Save the queues and close the application.
     """
-    canvas_long_queue.config(scrollregion=canvas_long_queue.bbox("all"))
+    if queue_log is not None:
+        queue_log.close()
+    if history_store is not None:
+        history_store.close()
+    if queue_client is not None:
+        queue_client.close()
+    if METRICS_PATH:
+        metrics.write(METRICS_PATH)
+    profiler.report()
+    root.destroy()
 
 
-def time_convert(time_digit):
+def receive():
     """
-    Convert the time into a desired format.
-    :param time_digit: (int) The original time expression
-    :return (str): The converted time expression
+    Apply the changes pushed by the queue server, which the panels of the queues are told about.
     """
-    if time_digit < 60:
-        time_string = "a few seconds"
-    elif 60 <= time_digit < 120:
-        time_string = "a minute"
-    elif 120 <= time_digit < 3600:
-        minutes = time_digit // 60
-        time_string = "{} minutes".format(minutes)
-    elif 3600 <= time_digit < 7200:
-        time_string = "1 hour"
-    else:
-        hours = time_digit // 3600
-        time_string = "{} hours".format(hours)
-    return time_string
+    queue_client.drain()
+    root.after(RECEIVE_PERIOD, receive)
 
 
-def quick_toggle():
+def write_metrics():
     """
-    Control the button settings between two different modes for the quick queue.
+    Write the metrics to their file, then again every METRICS_PERIOD milliseconds.
     """
-    global quick_precise_timing
-    if button_quick_timing.config("text")[-1] == "Precise Timing Off":
-        button_quick_timing.config(text="Precise Timing On",
-                                   bg="#3c763d", highlightbackground="#3c763d")
-        quick_precise_timing = True
-        time.sleep(REFRESH_PERIOD)
-        quick_redraw_accurate()
-    else:
-        button_quick_timing.config(text="Precise Timing Off",
-                                   bg="#c0c1c4", highlightbackground="#c0c1c4")
-        quick_precise_timing = False
-        time.sleep(REFRESH_PERIOD)
-        quick_redraw_approx()
+    metrics.write(METRICS_PATH)
+    root.after(METRICS_PERIOD, write_metrics)
 
 
-def long_toggle():
+def write_profile():
     """
-    Control the button settings between two different modes for the long queue.
+    Write a profiling report, then another one every PROFILE_PERIOD milliseconds.
     """
-    global long_precise_timing
-    if button_long_timing.config("text")[-1] == "Precise Timing Off":
-        button_long_timing.config(text="Precise Timing On",
-                                  bg="#31708f", highlightbackground="#31708f")
-        long_precise_timing = True
-        time.sleep(REFRESH_PERIOD)
-        long_redraw_accurate()
-    else:
-        button_long_timing.config(text="Precise Timing Off",
-                                  bg="#c0c1c4", highlightbackground="#c0c1c4")
-        long_precise_timing = False
-        time.sleep(REFRESH_PERIOD)
-        long_redraw_approx()
+    profiler.report()
+    root.after(PROFILE_PERIOD, write_profile)
 
 
 def target_hit_effects(target):
@@ -157,6 +170,19 @@ def target_hit_effects(target):
     target.master.itemconfig(target.circle_3rd, outline="#6dff79")
 
 
+def name_alert(name):
+    """
+    Verify an input name.
+    :param name (str): The user input name
+    :return: The function displaying the alert the name fails verification with, None if it passes
+    """
+    problem = name_problem(name)
+    if problem is None:
+        return None
+    return {"too long": name_limit_alert, "unaccepted characters": unaccepted_char_alert}.get(problem,
+                                                                                              invalid_name_alert)
+
+
 # Alerts #
 def name_limit_alert():
     """
@@ -186,25 +212,26 @@ def in_self_queue_alert():
                          "\nYou cannot have two identities in one queue")
 
 
-def in_quick_queue_alert():
+def in_another_queue_alert(queue):
     """
-    Display the message indicating the user cannot enter the long queue
-    if they are already in the quick queue.
-    :return:
+    Display the message indicating the user cannot enter a queue
+    if they are already in another queue.
+    :param queue: The question queue the user is already in
     """
     messagebox.showerror("Already in Another queue",
                          "Sorry the request is rejected as "
-                         "you have already requested help in the quick question queue")
+                         "you have already requested help in the {} question queue".format(queue.name))
 
 
-def in_long_queue_alert():
+def server_alert(error):
     """
-    Display the message indicating the user cannot enter the quick queue
-    if they are already in the long queue.
+    Display the message indicating a request could not be carried out by the queue server.
+    :param error (Exception): The ConnectionError if the server is unreachable, or the ValueError if it rejected
+                              the request
     """
-    messagebox.showerror("Already in Another queue",
-                         "Sorry the request is rejected as "
-                         "you have already requested help in the long question queue")
+    messagebox.showerror("Queue Server Problem",
+                         "Sorry the request has not been carried out by the queue server.\n"
+                         "\n{}".format(error))
 
 
 def invalid_name_alert():
@@ -242,65 +269,213 @@ def long_game_red_win():
     messagebox.showinfo("Game Over", "The red side has won.")
 
 
-# ------ The Queue Class ------ #
+# ------ Refresh Scheduler ------ #
 
 
-class Queue:
+class Panel:
     """
-    A queue list
+    The displayed rows and average wait time of a queue.
+    Only the rows within sight of the canvas viewport are backed by widgets,
+    which are recycled as the queue changes or is scrolled.
+    The panel follows the changes of its queue, so a change out of sight costs no more than its scroll region,
+    and a batch of changes no more than its last one.
     """
-    
-    def __init__(self, starting_queue=None):
+
+    def __init__(self, canvas, queue, average, refresh):
+        """
+        Construct the display state of a queue.
+        :param canvas: The scrollable canvas holding the rows
+        :param queue: The question queue whose recipients the rows act on
+        :param average (StringVar): The variable holding the average wait time text
+        :param refresh: The function redrawing the queue
+        """
+        self.canvas = canvas
+        self.queue = queue
+        self.average = average
+        self.refresh = refresh
+        self.width = int(canvas.cget("width"))
+        self.height = int(canvas.cget("height"))
+        # Enough rows to fill the viewport, plus the overscan above and below it
+        self.pool_size = -(-self.height // ROW_HEIGHT) + 2 * ROW_OVERSCAN + 1
+        self.rows = []  # The pooled rows, the entry at position p is displayed by rows[p % len(rows)]
+        self.total = 0  # The number of recipients in the queue
+        self.first = 0  # The position of the first entry displayed by the last render
+        self.entries = []  # The entries displayed by the last render
+        self.average_text = average.get()
+        self.selected = set()  # The names of the recipients selected for a batch
+
+    def window(self):
         """
-        Construct a queue list.
-        :param starting_queue: The starting queue
+        Return the positions of the entries within sight of the viewport.
+        :return (tuple): The position of the first entry and the position after the last entry
         """
-        if starting_queue is None:
-            starting_queue = []
-        self.starting_queue = starting_queue
+        first = max(int(self.canvas.canvasy(0)) // ROW_HEIGHT - ROW_OVERSCAN, 0)
+        return first, first + self.pool_size
 
-    def get_queue(self):
+    def changed(self, change):
+        """
+        Resize the scroll region to a change of the queue and request a redraw of the queue.
+        This is a listener of the question queue.
+        :param change (Change): The change to the question queue
+        """
+        if change.action != "join":
+            self.selected.discard(change.recipient.name)
+        if change.pending:
+            return
+        if change.waiting != self.total:
+            self.total = change.waiting
+            self.canvas.config(scrollregion=(0, 0, self.width, self.total * ROW_HEIGHT))
+        scheduler.mark_dirty(self.refresh)
+
+    def render(self, first, entries, average_text, total):
+        """
+        Display the given entries and average wait time, skipping whatever is already displayed.
+        :param first (int): The position of the first entry
+        :param entries (list): (name, questions, time string) tuples of the entries within sight in display order
+        :param average_text (str): The average wait time text
+        :param total (int): The number of recipients in the queue
+        :return (bool): True if anything visible has changed and False otherwise
+        """
+        changed = False
+        if total != self.total:
+            self.total = total
+            self.canvas.config(scrollregion=(0, 0, self.width, total * ROW_HEIGHT))
+            changed = True
+        if first != self.first or entries != self.entries:
+            self.first = first
+            self.entries = entries
+            self.show()
+            changed = True
+        if average_text != self.average_text:
+            self.average.set(average_text)
+            self.average_text = average_text
+            changed = True
+        return changed
+
+    def yview(self, *args):
         """
-        Return the queue list.
-        :return (list): The queue list
+        Scroll the canvas and request a redraw of the rows moving into sight.
         """
-        return self.starting_queue
+        self.canvas.yview(*args)
+        scheduler.mark_dirty(self.refresh)
 
+    def show(self):
+        """
+        Bind the pooled rows to the entries within sight of the viewport and hide the others.
+        """
+        while len(self.rows) < min(self.pool_size, len(self.entries)):
+            self.rows.append(RecipientRow(self.canvas, self.queue, self.selected))
+        shown = set()
+        for offset, (name, question, time_string) in enumerate(self.entries):
+            position = self.first + offset
+            index = position % len(self.rows)
+            self.rows[index].update(name, question, time_string, position)
+            shown.add(index)
+        for index, row in enumerate(self.rows):
+            if index not in shown:
+                row.hide()
 
-# Instantiation
-quick_add_queue = Queue()
-long_add_queue = Queue()
-quick_delete_queue = Queue()
-long_delete_queue = Queue()
 
+class RefreshScheduler:
+    """
+    A single refresh cycle shared by the queues, sleeping until the next queue display is due to change
+    """
 
-# ------ Quick Question Queue ------ #
+    def __init__(self, master):
+        """
+        Construct a refresh scheduler.
+        :param master: The widget used to schedule the refreshes
+        """
+        self.master = master
+        self.refreshes = []  # The redraw function of every queue
+        self.due = {}  # The time at which each queue display next changes, None if it never does
+        self.dirty = []  # The redraw functions requested since the last tick
+        self.tick_job = None
+        self.flush_job = None
+
+    def register(self, refresh):
+        """
+        Add a queue to the refresh cycle.
+        :param refresh: The function redrawing the queue and returning when its display next changes
+        """
+        self.refreshes.append(refresh)
+        self.due[refresh] = None
+
+    def mark_dirty(self, refresh):
+        """
+        Request a redraw of a queue as soon as the main loop is idle.
+        Requests made before then are merged into a single redraw per queue.
+        :param refresh: The function redrawing the queue
+        """
+        if refresh not in self.dirty:
+            self.dirty.append(refresh)
+        if self.flush_job is None:
+            self.flush_job = self.master.after_idle(self.tick)
+
+    def tick(self):
+        """
+        Redraw every queue which was requested or whose display is due to change,
+        then sleep until the next display change.
+        """
+        for job in (self.tick_job, self.flush_job):
+            if job is not None:
+                self.master.after_cancel(job)
+        self.tick_job = None
+        self.flush_job = None
+        now = time.time()
+        dirty, self.dirty = self.dirty, []
+        for refresh in self.refreshes:
+            due = self.due[refresh]
+            if refresh in dirty or (due is not None and due <= now):
+                self.due[refresh] = refresh()
+        due = [due for due in self.due.values() if due is not None]
+        if due:
+            delay = max(min(due) - time.time(), 0)
+            self.tick_job = self.master.after(int(delay * 1000) + 1, self.tick)
+
+
+scheduler = RefreshScheduler(root)
+metrics = Metrics()
+profiler = Profiler(PROFILE_PATH)
+
+
+# ------ Question Queues ------ #
+
+
+QueueType = namedtuple("QueueType", ["name", "subtitle", "colour", "background", "button_colour", "instructions",
+                                     "game", "game_colour"])
 
 
-class QuickRecipient:
+class RecipientRow:
     """
-    A recipient in the quick question queue
+    A row displaying a recipient in a question queue
     """
 
-    def __init__(self, name, question, starting_time):
+    def __init__(self, master, queue, selected):
         """
-        Construct a recipient in the quick question queue.
-        :param name (str): The name of the recipient
-        :param question (int): The number of questions answered of the recipient
-        :param starting_time (int): The time when the recipient enters the queue
-        """
-        self.name = name
-        self.question = question
-        self.starting_time = starting_time
-        self.frame = Frame(frame_quick_queue, width=515, height=30)
-        self.frame.grid(sticky=W)
-        self.label_row = Label(self.frame, text=get_row(self.frame) + 1)
+        Construct a row for the recipients in a question queue.
+        The row is hidden until a recipient is bound to it, and clicking it selects the recipient for a batch.
+        :param master: The canvas holding the row
+        :param queue: The question queue of the recipients
+        :param selected (set): The names of the recipients selected for a batch, shared by the rows of the queue
+        """
+        self.master = master
+        self.queue = queue
+        self.selected = selected
+        self.highlighted = False
+        self.name = None
+        self.question = None
+        self.starting_time = None
+        self.position = None
+        self.frame = Frame(self.master, width=515, height=ROW_HEIGHT)
+        self.window = self.master.create_window(0, 0, window=self.frame, anchor=NW, state="hidden")
+        self.label_row = Label(self.frame)
         self.label_row.place(x=0, y=3)
-        self.label_name = Label(self.frame, text=self.name)
+        self.label_name = Label(self.frame)
         self.label_name.place(x=30, y=3)
-        self.label_question = Label(self.frame, text=self.question)
+        self.label_question = Label(self.frame)
         self.label_question.place(x=200, y=3)
-        self.label_time = Label(self.frame, text=self.starting_time)
+        self.label_time = Label(self.frame)
         self.label_time.place(x=305, y=3)
         self.cancel_button = Button(self.frame, bg="red", highlightbackground="red")
         self.cancel_button.config(text="    ", cursor="hand2", command=self.cancel)
@@ -308,365 +483,599 @@ class QuickRecipient:
         self.confirm_button = Button(self.frame, bg="green", highlightbackground="green")
         self.confirm_button.config(text="    ", cursor="hand2", command=self.confirm)
         self.confirm_button.place(x=475, y=3)
+        self.labels = [self.label_row, self.label_name, self.label_question, self.label_time]
+        self.background = self.frame.cget("bg")
+        for widget in [self.frame] + self.labels:
+            widget.bind("<Button-1>", self.select)
+
+    def update(self, name, question, starting_time, position):
+        """
+        Bind a recipient to the row, reconfiguring only the parts of the row that have changed.
+        :param name (str): The name of the recipient
+        :param question (int): The number of questions answered of the recipient
+        :param starting_time (str): The wait time displayed for the recipient
+        :param position (int): The row of the recipient in the queue
+        """
+        if name != self.name:
+            self.name = name
+            self.label_name.config(text=name)
+        if question != self.question:
+            self.question = question
+            self.label_question.config(text=question)
+        if starting_time != self.starting_time:
+            self.starting_time = starting_time
+            self.label_time.config(text=starting_time)
+        if position != self.position:
+            if self.position is None:
+                self.master.itemconfig(self.window, state="normal")
+            self.position = position
+            self.master.coords(self.window, 0, position * ROW_HEIGHT)
+            self.label_row.config(text=position + 1)
+        if (name in self.selected) != self.highlighted:
+            self.highlight(not self.highlighted)
+
+    def highlight(self, highlighted):
+        """
+        Show whether the recipient of the row is selected.
+        :param highlighted (bool): True if the recipient is selected and False otherwise
+        """
+        self.highlighted = highlighted
+        background = SELECTED_COLOUR if highlighted else self.background
+        for widget in [self.frame] + self.labels:
+            widget.config(bg=background)
+
+    def select(self, event=None):
+        """
+        Select the recipient of the row for a batch, or unselect them if they already are.
+        """
+        if self.name in self.selected:
+            self.selected.discard(self.name)
+        else:
+            self.selected.add(self.name)
+        self.highlight(self.name in self.selected)
+
+    def hide(self):
+        """
+        Hide the row until another recipient is bound to it.
+        """
+        if self.position is not None:
+            self.master.itemconfig(self.window, state="hidden")
+            self.position = None
 
     def cancel(self):
         """
         Remove the recipient from the question queue.
         """
-        for recipient in quick_add_queue.get_queue():
-            if recipient[0] == self.name:
-                quick_add_queue.get_queue().remove(recipient)
-        self.frame.destroy()
+        try:
+            self.queue.cancel(self.name)
+        except (ConnectionError, ValueError) as error:
+            server_alert(error)
 
     def confirm(self):
         """
         Remove the recipient from the question queue and store it in a dump queue.
         """
-        for recipient in quick_add_queue.get_queue():
-            if recipient[0] == self.name:
-                quick_add_queue.get_queue().remove(recipient)
-                quick_delete_queue.get_queue().append(recipient)
-        self.frame.destroy()
+        try:
+            self.queue.confirm(self.name)
+        except (ConnectionError, ValueError) as error:
+            server_alert(error)
 
 
-def quick_get_name():
+class QueueSection:
     """
-    Display a text dialog window and pass on the entry for the quick queue.
+    The column of the window displaying a question queue, from its heading down to its rows
     """
-    name = simpledialog.askstring(" ", "What is your name?", initialvalue="e.g. Peter O'Shea")
-    quick_verify_name(name)
-
 
-def quick_verify_name(name):
-    """
-    Verify the entry and pass on the name for the quick queue.
-    Display alert messages if it fails verification.
-    :param name: The user input name
-    """
-    try:
-        if len(name) > 17:
-            name_limit_alert()
-            quick_get_name()
-        elif (all(char.isalpha() or char == " " or char == "'" for char in name) and
-              not all(char.isspace() for char in name)):
-            quick_ask(name)
-        elif (char == "." for char in name) and not all(char.isspace() for char in name):
-            unaccepted_char_alert()
-            quick_get_name()
+    def __init__(self, queue_type, queue, x):
+        """
+        Construct the column of a question queue and add the queue to the refresh cycle.
+        :param queue_type (QueueType): The description of the question queue
+        :param queue: The question queue
+        :param x (int): The position of the left edge of the column
+        """
+        self.type = queue_type
+        self.queue = queue
+        self.precise_timing = False
+        # The hot paths of the queue, which are only wrapped when profiling is switched on
+        self.refresh = profiler.wrap("redraw {}".format(queue.name), self.refresh)
+        self.ask = profiler.wrap("ask {}".format(queue.name), self.ask)
+        self.average = StringVar()
+        self.average.set(NO_STUDENTS)
+        title = queue_type.name.title()
+        # Everything below the instructions moves down by a row for every instruction
+        y = 20 * len(queue_type.instructions)
+
+        # Question Heading and Subtitle (featured with the colour of the queue on its background)
+        self.frame_questions = Frame(root, width=COLUMN_WIDTH, height=100, bg=queue_type.background)
+        self.frame_questions.place(x=x, y=120)
+
+        self.label_questions = Label(self.frame_questions)
+        self.label_questions.config(fg=queue_type.colour, bg=queue_type.background, font="Helvetica 25")
+        self.label_questions.config(text="{} Questions".format(title))
+        self.label_questions.place(x=150, y=10)
+
+        self.label_subs = Label(self.frame_questions)
+        self.label_subs.config(fg="#666", bg=queue_type.background, font="Arial 14 italic")
+        self.label_subs.config(text=queue_type.subtitle)
+        self.label_subs.place(x=170, y=60)
+
+        # Question Instructions (one bullet point per line)
+        self.frame_instructions = Frame(root, width=COLUMN_WIDTH, height=110 + y)
+        self.frame_instructions.place(x=x, y=240)
+
+        self.label_instruction_heading = Label(self.frame_instructions)
+        self.label_instruction_heading.config(text="Some examples of {} questions:".format(queue_type.name))
+        self.label_instruction_heading.place(x=0, y=0)
+
+        for i, instruction in enumerate(queue_type.instructions):
+            label_instruction = Label(self.frame_instructions)
+            label_instruction.config(text="    \u2022 " + instruction)
+            label_instruction.place(x=0, y=20 * (i + 1))
+
+        # Request Help Button (featured with a font colour of white on the button colour of the queue)
+        self.button_request = Button(self.frame_instructions)
+        self.button_request.config(fg="#fff", bg=queue_type.button_colour,
+                                   highlightbackground=queue_type.button_colour, padx=10, pady=10)
+        self.button_request.config(cursor="hand2", command=self.get_name)
+        self.button_request.config(text="Request {} Help".format(title))
+        self.button_request.place(x=180, y=55 + y)
+
+        # Game Button, for the queues with a game to play while waiting
+        if queue_type.game is not None:
+            self.button_game = Button(self.frame_instructions)
+            self.button_game.config(fg="#fff", bg=queue_type.game_colour,
+                                    highlightbackground=queue_type.game_colour, padx=10, pady=10)
+            self.button_game.config(cursor="hand2", command=queue_type.game)
+            self.button_game.config(text="Play Game")
+            self.button_game.place(x=380, y=55 + y)
+
+        # Separators around the average wait time and the heading of the rows
+        Frame(root, width=COLUMN_WIDTH, height=2, bg="#dddcd4").place(x=x, y=350 + y)
+
+        self.frame_average = Frame(root, width=COLUMN_WIDTH, height=46)
+        self.frame_average.place(x=x, y=352 + y)
+
+        self.label_average = Label(self.frame_average)
+        self.label_average.config(textvariable=self.average)
+        self.label_average.place(x=0, y=10)
+
+        Frame(root, width=COLUMN_WIDTH, height=2, bg="#dddcd4").place(x=x, y=398 + y)
+
+        self.frame_heading = Frame(root, width=COLUMN_WIDTH, height=38)
+        self.frame_heading.place(x=x, y=400 + y)
+
+        self.label_heading = Label(self.frame_heading)
+        self.label_heading.config(font="Helvetica 12 bold")
+        self.label_heading.config(text="#" + " " * 5 + "Name" + " " * 20 + "Questions Asked" + " " * 10 + "Time")
+        self.label_heading.place(x=0, y=7)
+
+        self.button_timing = Button(self.frame_heading, width=14)
+        self.button_timing.config(bg="#c0c1c4", highlightbackground="#c0c1c4", padx=10, pady=2)
+        self.button_timing.config(cursor="hand2", command=self.toggle)
+        self.button_timing.config(text="Precise Timing Off")
+        self.button_timing.place(x=380, y=4)
+
+        Frame(root, width=COLUMN_WIDTH, height=2, bg="#dddcd4").place(x=x, y=438 + y)
+
+        # Batch Buttons, acting on the rows selected by clicking them
+        self.frame_batch = Frame(root, width=COLUMN_WIDTH, height=BATCH_HEIGHT)
+        self.frame_batch.place(x=x, y=440 + y)
+
+        batch_buttons = [("Accept Selected", "green", self.accept_selected),
+                         ("Cancel Selected", "red", self.cancel_selected),
+                         ("Clear Queue", "#c0c1c4", self.clear),
+                         ("Add Students", queue_type.button_colour, self.add_students)]
+        for i, (text, colour, command) in enumerate(batch_buttons):
+            button = Button(self.frame_batch, bg=colour, highlightbackground=colour, padx=4, pady=0)
+            button.config(text=text, cursor="hand2", command=command)
+            button.place(x=130 * i, y=2)
+
+        # Queue Canvas And Scrollbar, filling the rest of the column
+        height = WINFO_HEIGHT - 460 - y
+        self.canvas = Canvas(root, width=515, height=height, bd=0, highlightthickness=0)
+        self.canvas.place(x=x, y=440 + BATCH_HEIGHT + y)
+
+        self.panel = Panel(self.canvas, queue, self.average, self.refresh)
+        queue.listeners.append(self.panel.changed)
+
+        self.bar = Scrollbar(root, orient="vertical", command=self.panel.yview)
+        self.canvas.config(yscrollcommand=self.bar.set)
+        self.bar.place(x=x + 515, y=440 + BATCH_HEIGHT + y, height=height)
+
+        self.accurate_durations = metrics.histogram("class_queue_redraw_seconds", "Time taken by each redraw",
+                                                    queue=queue.name, mode="accurate")
+        self.approximate_durations = metrics.histogram("class_queue_redraw_seconds", "Time taken by each redraw",
+                                                       queue=queue.name, mode="approximate")
+        scheduler.register(self.refresh)
+
+    def toggle(self):
+        """
+        Control the button settings between two different modes for the queue.
+        """
+        if self.button_timing.config("text")[-1] == "Precise Timing Off":
+            self.button_timing.config(text="Precise Timing On",
+                                      bg=self.type.colour, highlightbackground=self.type.colour)
+            self.precise_timing = True
         else:
-            invalid_name_alert()
-            quick_get_name()
-    except TypeError:
-        pass
-
-
-def quick_ask(name):
-    """
-    1. If the name is found to be already in some queue then raise alerts accordingly.
-    2. If the name is found in the dump queue then count the number
-       and store it as the number of questions answered.
-    3. Record the time when the recipient enters the queue
-    4. Instantiate from the queue class and store the corresponding attributes.
-    5. Execute the accurate or approximate time mode accordingly for the quick queue.
-    :param name: The verified input name
-    """
-    if any(recipient[0] == name for recipient in quick_add_queue.get_queue()):
-        return in_self_queue_alert()
-    if any(recipient[0] == name for recipient in long_add_queue.get_queue()):
-        return in_long_queue_alert()
-    questions_asked = 0
-    for recipient in quick_delete_queue.get_queue():
-        if recipient[0] == name:
-            questions_asked += 1
-    start_time = time.time()
-    quick_add_queue.get_queue().append((name, questions_asked, round(start_time)))
-    if quick_precise_timing:
-        quick_redraw_accurate(True)
-    else:
-        quick_redraw_approx(True)
-
-
-def quick_redraw_accurate(new_entry=False):
-    """
-    1. Sort the queue list according to firstly questions answered in ascending order
-       and secondly the time elapsed in descending order.
-    2. Calculate the average wait time.
-    3. Refresh this process for the quick queue and perform the accurate display.
-    :param new_entry: Determines if it is a new entry.
-    """
-    global quick_precise_timing
-    queue_list = quick_add_queue.get_queue()
-    sorted_queue_list = sorted(sorted(queue_list, key=lambda x: x[2]), key=lambda x: x[1])
-    sum_time = 0
-    for frame in frame_quick_queue.winfo_children():
-        frame.destroy()
-    for recipient in sorted_queue_list:
-        end_time = time.time()
-        elapsed_time = round(end_time) - recipient[2]
-        sum_time += elapsed_time
-        if elapsed_time == 0:
-            QuickRecipient(recipient[0], recipient[1], "{} second ago".format(elapsed_time))
+            self.button_timing.config(text="Precise Timing Off",
+                                      bg="#c0c1c4", highlightbackground="#c0c1c4")
+            self.precise_timing = False
+        scheduler.mark_dirty(self.refresh)
+
+    def get_name(self):
+        """
+        Display a text dialog window and pass on the entry for the queue.
+        """
+        name = simpledialog.askstring(" ", "What is your name?", initialvalue="e.g. Peter O'Shea")
+        self.verify_name(name)
+
+    def verify_name(self, name):
+        """
+        Verify the entry and pass on the name for the queue.
+        Display alert messages if it fails verification.
+        :param name: The user input name
+        """
+        if name is None:
+            return
+        alert = name_alert(name)
+        if alert is None:
+            self.ask(name)
         else:
-            QuickRecipient(recipient[0], recipient[1], "{} seconds ago".format(elapsed_time))
-    try:
-        recipient_number = len(sorted_queue_list)
-        average_wait_time = sum_time // recipient_number
-        if recipient_number == 1:
-            if average_wait_time == 0:
-                quick_average.set("An average wait time of {} second for 1 student."
-                                  .format(average_wait_time))
-            else:
-                quick_average.set("An average wait time of {} seconds for 1 student."
-                                  .format(average_wait_time))
-        elif recipient_number > 1:
-            quick_average.set("An average wait time of about {} seconds "
-                              "for {} students"
-                              .format(average_wait_time, recipient_number))
-    except ZeroDivisionError:
-        pass
-    if not new_entry:
-        if quick_precise_timing:
-            root.after(REFRESH_PERIOD * 1000, quick_redraw_accurate)
-
-
-def quick_redraw_approx(new_entry=False):
-    """
-    1. Sort the queue list according to firstly questions answered in ascending order
-       and secondly the time elapsed in descending order.
-    2. Calculate the average wait time.
-    3. Refresh this process for the quick queue and perform the approximate display.
-    :param new_entry: Determines if it is a new entry.
-    """
-    global quick_precise_timing
-    quick_queue_list = quick_add_queue.get_queue()
-    quick_sorted_queue_list = sorted(sorted(quick_queue_list, key=lambda x: x[2]), key=lambda x: x[1])
-    sum_time = 0
-    for frame in frame_quick_queue.winfo_children():
-        frame.destroy()
-    for recipient in quick_sorted_queue_list:
-        end_time = time.time()
-        elapsed_time = round(end_time) - recipient[2]
-        sum_time += elapsed_time
-        QuickRecipient(recipient[0], recipient[1], "{} ago".format(time_convert(elapsed_time)))
-    try:
-        recipient_number = len(quick_sorted_queue_list)
-        average_wait_time = sum_time // recipient_number
-        if recipient_number == 1:
-            quick_average.set("An average wait time of {} for 1 student."
-                              .format(time_convert(average_wait_time)))
-        elif recipient_number > 1:
-            quick_average.set("An average wait time of about {} "
-                              "for {} students"
-                              .format(time_convert(average_wait_time), recipient_number))
-    except ZeroDivisionError:
-        pass
-    if not new_entry:
-        if not quick_precise_timing:
-            root.after(REFRESH_PERIOD * 1000, quick_redraw_approx)
-
-
-# If precise timing is switched on perform the accurate mode, otherwise perform the approximate mode.
-if quick_precise_timing:
-    root.after(REFRESH_PERIOD * 1000, quick_redraw_accurate)
-else:
-    root.after(REFRESH_PERIOD * 1000, quick_redraw_approx)
+            alert()
+            self.get_name()
 
+    def ask(self, name):
+        """
+        1. Join the name to the queue, which records the time when the recipient enters the queue
+           and looks up the number of questions answered from the dump queue.
+        2. If the name is found to be already in some queue then raise alerts accordingly,
+           looking it up in the single index of the registry, or if the queue server cannot carry out the request.
+        3. The panel of the queue redraws it when told about the change.
+        :param name: The verified input name
+        """
+        try:
+            self.queue.join(name)
+        except AlreadyQueuedError:
+            return in_self_queue_alert()
+        except InAnotherQueueError as error:
+            return in_another_queue_alert(error.queue)
+        except (ConnectionError, ValueError) as error:
+            return server_alert(error)
+
+    def accept_selected(self):
+        """
+        Accept the requests of the selected recipients as one batch.
+        """
+        try:
+            self.queue.confirm_many(list(self.panel.selected))
+        except (ConnectionError, ValueError) as error:
+            server_alert(error)
 
-# ------ Long Question Queue ------ #
+    def cancel_selected(self):
+        """
+        Cancel the requests of the selected recipients as one batch.
+        """
+        try:
+            self.queue.cancel_many(list(self.panel.selected))
+        except (ConnectionError, ValueError) as error:
+            server_alert(error)
 
+    def clear(self):
+        """
+        Cancel every request in the queue as one batch, once the user has confirmed it.
+        """
+        if self.queue.waiting and messagebox.askyesno("Clear Queue",
+                                                      "Remove every student from the {} queue?".format(self.type.name)):
+            try:
+                self.queue.clear()
+            except (ConnectionError, ValueError) as error:
+                server_alert(error)
+
+    def add_students(self):
+        """
+        Display a text dialog window and join every name entered to the queue as one batch.
+        Nobody joins if any name fails verification or is already queued.
+        """
+        text = simpledialog.askstring(" ", "What are the names of the students, separated by commas?")
+        if text is None:
+            return
+        names = [name.strip() for name in text.split(",") if name.strip()]
+        for name in names:
+            alert = name_alert(name)
+            if alert is not None:
+                return alert()
+        try:
+            self.queue.join_many(names)
+        except AlreadyQueuedError:
+            return in_self_queue_alert()
+        except InAnotherQueueError as error:
+            return in_another_queue_alert(error.queue)
+        except (ConnectionError, ValueError) as error:
+            return server_alert(error)
+
+    def redraw_accurate(self):
+        """
+        1. Retrieve the accurate display of the rows of the queue within sight, kept in order of firstly
+           questions answered in ascending order and secondly the time elapsed in descending order.
+        2. Perform the accurate display for the queue.
+        :return (int): The time of the next accurate refresh or None if the queue is empty
+        """
+        end_time = round(time.time())
+        first, last = self.panel.window()
+        entries, average_text = self.queue.accurate_display(end_time, first, last)
+        self.panel.render(first, entries, average_text, len(self.queue.waiting))
+        if not self.queue.waiting:
+            return None
+        return end_time + REFRESH_PERIOD
+
+    def redraw_approx(self):
+        """
+        1. Retrieve the approximate display of the rows of the queue within sight and when it is next due to change.
+        2. Perform the approximate display for the queue.
+        :return (int): The time at which the display next changes or None if the queue is empty
+        """
+        first, last = self.panel.window()
+        entries, average_text, next_change = self.queue.approximate_display(round(time.time()), first, last)
+        self.panel.render(first, entries, average_text, len(self.queue.waiting))
+        return next_change
+
+    def refresh(self):
+        """
+        Redraw the queue in the current timing mode.
+        :return (int): The time at which the display next changes or None if the queue is empty
+        """
+        # If precise timing is switched on perform the accurate mode, otherwise perform the approximate mode.
+        if self.precise_timing:
+            return self.accurate_durations.time(self.redraw_accurate)
+        return self.approximate_durations.time(self.redraw_approx)
+
+# ------ Game Loop ------ #
 
-class LongRecipient:
+
+class GameLoop:
     """
-    A recipient in the long question queue
+    A game simulated in fixed time steps and drawn at a target frame rate, scheduled by the main loop
+    so the queues keep refreshing while a game is played
     """
 
-    def __init__(self, name, question, starting_time):
+    def __init__(self, master, step, draw, fps=GAME_FPS, durations=None):
         """
-        Construct a recipient in the long question queue.
-        :param name (str): The name of the recipient
-        :param question (int): The number of questions answered of the recipient
-        :param starting_time (int): The time when the recipient enters the queue
-        """
-        self.name = name
-        self.question = question
-        self.starting_time = starting_time
-        self.frame = Frame(frame_long_queue, width=515, height=30)
-        self.frame.grid(sticky=W)
-        self.label_row = Label(self.frame, text=get_row(self.frame) + 1)
-        self.label_row.place(x=0, y=3)
-        self.label_name = Label(self.frame, text=self.name)
-        self.label_name.place(x=30, y=3)
-        self.label_question = Label(self.frame, text=self.question)
-        self.label_question.place(x=200, y=3)
-        self.label_time = Label(self.frame, text=self.starting_time)
-        self.label_time.place(x=305, y=3)
-        self.cancel_button = Button(self.frame, bg="red", highlightbackground="red")
-        self.cancel_button.config(text="    ", cursor="hand2", command=self.cancel)
-        self.cancel_button.place(x=450, y=3)
-        self.confirm_button = Button(self.frame, bg="green", highlightbackground="green")
-        self.confirm_button.config(text="    ", cursor="hand2", command=self.confirm)
-        self.confirm_button.place(x=475, y=3)
+        Construct a game loop.
+        :param master: The window of the game, the loop stops once it is destroyed
+        :param step: The function advancing the game by GAME_STEP seconds and returning False once the game is over
+        :param draw: The function drawing the game on its canvas once per frame
+        :param fps (int): The number of frames drawn per second
+        :param durations (Histogram): The histogram observing the time taken by each frame
+        """
+        self.master = master
+        self.step = step
+        self.draw = draw
+        self.fps = fps
+        self.durations = durations
+        self.lag = 0  # The number of seconds the simulation is behind the clock
+        self.last_frame = None
+        self.job = None
+
+    def start(self):
+        """
+        Start the game.
+        """
+        self.lag = 0
+        self.last_frame = time.perf_counter()
+        self.job = self.master.after(0, self.frame)
 
-    def cancel(self):
+    def stop(self):
         """
-        Remove the recipient from the question queue.
+        Stop the game.
         """
-        for recipient in long_add_queue.get_queue():
-            if recipient[0] == self.name:
-                long_add_queue.get_queue().remove(recipient)
-        self.frame.destroy()
+        if self.job is not None:
+            self.master.after_cancel(self.job)
+            self.job = None
 
-    def confirm(self):
+    def frame(self):
         """
-        Remove the recipient from the question queue and store it in a dump queue.
+        Advance the game by the time elapsed since the last frame and draw it, then wait for the next frame.
+        """
+        self.job = None
+        if not self.master.winfo_exists():
+            return
+        now = time.perf_counter()
+        self.lag = min(self.lag + now - self.last_frame, GAME_LAG_LIMIT)
+        self.last_frame = now
+        while self.lag >= GAME_STEP:
+            self.lag -= GAME_STEP
+            if not self.step():
+                self.draw()
+                return
+        self.draw()
+        elapsed = time.perf_counter() - now
+        if self.durations is not None:
+            self.durations.observe(elapsed)
+        delay = 1 / self.fps - elapsed
+        self.job = self.master.after(max(int(delay * 1000), 1), self.frame)
+
+
+class ItemPool:
+    """
+    The canvas items of a game, hidden and handed out again between rounds instead of being created anew
+    """
+
+    # The options of an oval or rectangle left as Tk creates them unless given, so a reused item looks new
+    defaults = {"fill": "", "outline": "#000000", "width": 1}
+
+    def __init__(self, canvas):
         """
-        for recipient in long_add_queue.get_queue():
-            if recipient[0] == self.name:
-                long_add_queue.get_queue().remove(recipient)
-                long_delete_queue.get_queue().append(recipient)
-        self.frame.destroy()
+        Construct an empty pool.
+        :param canvas: The canvas of the game
+        """
+        self.canvas = canvas
+        self.free = {}  # The hidden items indexed by their type
+        self.used = []  # The items handed out since the last release
+        self.created = 0  # The number of items created, which stops growing once the first round is set up
 
+    def acquire(self, kind, coords, **options):
+        """
+        Hand out an item, reusing a hidden one of the same type if there is any.
+        :param kind (str): The type of the item, "oval" or "rectangle"
+        :param coords (tuple): The coordinates of the item
+        :param options: The options of the item
+        :return (int): The item
+        """
+        options = dict(self.defaults, **options)
+        free = self.free.get(kind)
+        if free:
+            item = free.pop()
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfig(item, state="normal", **options)
+            self.canvas.tag_raise(item)
+        else:
+            item = getattr(self.canvas, "create_" + kind)(*coords, **options)
+            self.created += 1
+        self.used.append((kind, item))
+        return item
 
-def long_get_name():
-    """
-    Display a text dialog window and pass on the entry for the long queue.
-    """
-    name = simpledialog.askstring(" ", "What is your name?", initialvalue="e.g. Peter O'Shea")
-    long_verify_name(name)
+    def release(self):
+        """
+        Hide every item handed out, keeping them for the next round.
+        """
+        for kind, item in self.used:
+            self.canvas.itemconfig(item, state="hidden")
+            self.free.setdefault(kind, []).append(item)
+        self.used = []
 
 
-def long_verify_name(name):
+class GameSession:
     """
-    Verify the entry and pass on the name for the long queue. Display alert messages if it fails verification.
-    :param name: The user input name
+    A game window built once and kept for the splash screen, every round and every restart of a game.
+    Closing the window only hides it until the game is played again.
     """
-    try:
-        if len(name) > 17:
-            name_limit_alert()
-            long_get_name()
-        elif (all(char.isalpha() or char == " " or char == "'" for char in name) and
-              not all(char.isspace() for char in name)):
-            long_ask(name)
-        elif (char == "." for char in name) and not all(char.isspace() for char in name):
-            unaccepted_char_alert()
-            long_get_name()
-        else:
-            invalid_name_alert()
-            long_get_name()
-    except TypeError:
-        pass
-
-
-def long_ask(name):
-    """
-    1. If the name is found to be already in some queue then raise alerts accordingly.
-    2. If the name is found in the dump queue then count the number
-       and store it as the number of questions answered.
-    3. Record the time when the recipient enters the queue
-    4. Instantiate from the queue class and store the corresponding attributes.
-    5. Execute the accurate or approximate time mode accordingly for the long queue.
-    :param name: The verified input name
-    """
-    if any(recipient[0] == name for recipient in long_add_queue.get_queue()):
-        return in_self_queue_alert()
-    if any(recipient[0] == name for recipient in quick_add_queue.get_queue()):
-        return in_quick_queue_alert()
-    questions_asked = 0
-    for recipient in long_delete_queue.get_queue():
-        if recipient[0] == name:
-            questions_asked += 1
-    start_time = time.time()
-    long_add_queue.get_queue().append((name, questions_asked, round(start_time)))
-    if long_precise_timing:
-        long_redraw_accurate(True)
-    else:
-        long_redraw_approx(True)
-
-
-def long_redraw_accurate(new_entry=False):
-    """
-    1. Sort the queue list according to firstly questions answered in ascending order
-       and secondly the time elapsed in descending order.
-    2. Calculate the average wait time.
-    3. Refresh this process for the long queue and perform the accurate display.
-    :param new_entry: Determines if it is a new entry.
-    """
-    global long_precise_timing
-    long_queue_list = long_add_queue.get_queue()
-    long_sorted_queue_list = sorted(sorted(long_queue_list, key=lambda x: x[2]), key=lambda x: x[1])
-    sum_time = 0
-    for frame in frame_long_queue.winfo_children():
-        frame.destroy()
-    for recipient in long_sorted_queue_list:
-        end_time = time.time()
-        elapsed_time = round(end_time) - recipient[2]
-        sum_time += elapsed_time
-        if elapsed_time == 0:
-            LongRecipient(recipient[0], recipient[1], "{} second ago".format(elapsed_time))
+
+    def __init__(self, title, new_game, alerts):
+        """
+        Construct a game session. The window is built when the game is first opened.
+        :param title (str): The title of the game window
+        :param new_game: The function returning the state of a new round
+        :param alerts (dict): The functions displaying the result of a round indexed by the result of its game
+        """
+        self.title = title
+        self.new_game = new_game
+        self.alerts = alerts
+        self.window = None
+        self.canvas = None
+        self.pool = None
+        self.game = None
+        self.loop = None
+        self.splash = []  # The canvas items shown until a round starts
+        self.drawings = []  # The drawings of the current round, each moved to the state it follows once per frame
+        self.over_job = None  # The scheduled display of the result of the round once it is over
+
+    def open(self):
+        """
+        Show the splash screen of the game, building the window the first time.
+        """
+        if self.window is None:
+            self.window = Toplevel()
+            self.window.geometry("1140x690")
+            self.window.resizable(0, 0)
+            self.window.title(self.title)
+            self.window.protocol("WM_DELETE_WINDOW", self.close)
+            self.canvas = Canvas(self.window, width=WINFO_WIDTH, height=WINFO_HEIGHT, bd=0, highlightthickness=0)
+            self.canvas.place(x=0, y=0)
+            self.pool = ItemPool(self.canvas)
+            self.splash = self.build()
+            self.loop = GameLoop(self.window, self.step, self.draw,
+                                 durations=metrics.histogram("class_queue_game_frame_seconds",
+                                                             "Time taken by each frame of the games", game=self.title))
+            self.loop.frame = profiler.wrap("frame {}".format(self.title), self.loop.frame)
         else:
-            LongRecipient(recipient[0], recipient[1], "{} seconds ago".format(elapsed_time))
-    try:
-        recipient_number = len(long_sorted_queue_list)
-        average_wait_time = sum_time // recipient_number
-        if recipient_number == 1:
-            if average_wait_time == 0:
-                long_average.set("An average wait time of {} second for 1 student."
-                                 .format(average_wait_time))
-            else:
-                long_average.set("An average wait time of {} seconds for 1 student."
-                                 .format(average_wait_time))
-        elif recipient_number > 1:
-            long_average.set("An average wait time of about {} seconds "
-                             "for {} students"
-                             .format(average_wait_time, recipient_number))
-    except ZeroDivisionError:
-        pass
-    if not new_entry:
-        if long_precise_timing:
-            root.after(REFRESH_PERIOD * 1000, long_redraw_accurate)
-
-
-def long_redraw_approx(new_entry=False):
-    """
-    1. Sort the queue list according to firstly questions answered in ascending order
-       and secondly the time elapsed in descending order.
-    2. Calculate the average wait time.
-    3. Refresh this process for the long queue and perform the accurate display.
-    :param new_entry: Determines if it is a new entry.
-    """
-    global long_precise_timing
-    queue_list = long_add_queue.get_queue()
-    sorted_queue_list = sorted(sorted(queue_list, key=lambda x: x[2]), key=lambda x: x[1])
-    sum_time = 0
-    for frame in frame_long_queue.winfo_children():
-        frame.destroy()
-    for recipient in sorted_queue_list:
-        end_time = time.time()
-        elapsed_time = round(end_time) - recipient[2]
-        sum_time += elapsed_time
-        LongRecipient(recipient[0], recipient[1], "{} ago".format(time_convert(elapsed_time)))
-    try:
-        recipient_number = len(sorted_queue_list)
-        average_wait_time = sum_time // recipient_number
-        if recipient_number == 1:
-            long_average.set("An average wait time of {} for 1 student."
-                             .format(time_convert(average_wait_time)))
-        elif recipient_number > 1:
-            long_average.set("An average wait time of about {} "
-                             "for {} students"
-                             .format(time_convert(average_wait_time), recipient_number))
-    except ZeroDivisionError:
-        pass
-    if not new_entry:
-        if not long_precise_timing:
-            root.after(REFRESH_PERIOD * 1000, long_redraw_approx)
-
-
-# If precise timing is switched on perform the accurate mode, otherwise perform the approximate mode.
-if long_precise_timing:
-    root.after(REFRESH_PERIOD * 1000, long_redraw_accurate)
-else:
-    root.after(REFRESH_PERIOD * 1000, long_redraw_approx)
+            self.window.deiconify()
+            self.window.lift()
+        self.restart()
+
+    def restart(self):
+        """
+        Set up a new round from the items of the last one and show the splash screen until the window is clicked.
+        """
+        self.stop()
+        self.pool.release()
+        self.game = self.new_game()
+        self.drawings = self.place()
+        for item in self.splash:
+            self.canvas.itemconfig(item, state="normal")
+            self.canvas.tag_raise(item)
+        self.window.bind("<Button-1>", self.play)
+
+    def play(self, event):
+        """
+        Hide the splash screen and start the round.
+        """
+        self.window.unbind("<Button-1>")
+        for item in self.splash:
+            self.canvas.itemconfig(item, state="hidden")
+        self.loop.start()
+
+    def step(self):
+        """
+        Move the game by one time step and display the result once it is over.
+        :return (bool): True if the game goes on and False otherwise
+        """
+        if self.game.step(GAME_STEP / TICK):
+            return True
+        self.over_job = self.window.after(500, self.over)
+        return False
+
+    def over(self):
+        """
+        Display the result of the round and get ready for the next one.
+        """
+        self.over_job = None
+        self.alert()
+        self.restart()
+
+    def stop(self):
+        """
+        Stop the round and drop the display of its result if it is still to come,
+        so it is never shown for a round restarted or closed in the meantime.
+        """
+        self.loop.stop()
+        if self.over_job is not None:
+            self.window.after_cancel(self.over_job)
+            self.over_job = None
+
+    def close(self):
+        """
+        Stop the round and hide the window.
+        """
+        self.stop()
+        self.window.withdraw()
+
+    def build(self):
+        """
+        Create the canvas items kept for every round, with no splash screen beyond the empty board by default.
+        :return (list): The items of the splash screen
+        """
+        return []
+
+    def place(self):
+        """
+        Create the drawings of a new round from the item pool, binding the keys of the game.
+        There are none by default.
+        :return (list): The drawings, each with a draw method
+        """
+        return []
+
+    def draw(self):
+        """
+        Draw the state of the game on its canvas.
+        """
+        for drawing in self.drawings:
+            drawing.draw()
+
+    def alert(self):
+        """
+        Display the result of the round.
+        """
+        self.alerts[self.game.result()]()
 
 
 # ------ Quick Question Game (Paddle Ball Game with A Single Player) ------ #
@@ -677,104 +1086,22 @@ class Sphere:
     A sphere that bounces back when hitting objects with boundaries
     """
 
-    def __init__(self, master, platform, target_left, target_right):
+    def __init__(self, master, pool, sphere):
         """
-        Construct a sphere that moves.
+        Construct the drawing of a moving sphere.
         :param master: The parent to contain the sphere object
-        :param platform: An instance of the Platform Class
-        :param target_left: An instance of the Target Class
-        :param target_right: An instance of the Target Class
+        :param pool (ItemPool): The pool of canvas items of the game
+        :param sphere (Box): The state of the sphere
         """
         self.master = master
-        self.platform = platform
-        self.target_left = target_left
-        self.target_right = target_right
-        self.sphere = self.master.create_oval(0, 0, 25, 25, fill="#f765b3")
-        self.master.move(self.sphere, 565, 300)
-        self.direction_x = random.choice([-4, -3, -2, -1, 1, 2, 3, 4])
-        self.direction_y = -4
-
-    def move(self):
-        """
-        Reverse the direction when hitting boundaries and
-        reset relevant variables if a target is hit.
-        """
-        global left_hit
-        global right_hit
-        global bottom_hit
-        try:
-            self.master.move(self.sphere, self.direction_x, self.direction_y)
-            sphere_position = self.master.coords(self.sphere)
-            # The sphere hits the top edge of the board.
-            if sphere_position[1] <= 0:
-                self.direction_y = 4
-            # The sphere hits the bottom edge of the board.
-            if sphere_position[3] >= WINFO_HEIGHT:
-                bottom_hit = True
-            # The sphere hits the left boundary of the board.
-            if sphere_position[0] <= 0:
-                self.direction_x = 4
-            # The sphere hits the right boundary of the board.
-            if sphere_position[2] >= WINFO_WIDTH:
-                self.direction_x = -4
-            # The sphere collides with the surface of the platform.
-            if self.collision(sphere_position):
-                self.direction_y = -4
-            if self.hit_left_target(sphere_position):
-                left_hit = True
-            if self.hit_right_target(sphere_position):
-                right_hit = True
-        except TclError:
-            pass
-
-    def collision(self, sphere_position):
-        """
-        Return True if the sphere is caught by the platform and False otherwise.
-        :param sphere_position: The position of the sphere
-        :return: True if the sphere is caught by the platform and False otherwise
-        """
-        platform_position = self.master.coords(self.platform.platform)
-        # The right side of the sphere meets the left side of the platform
-        if (sphere_position[2] >= platform_position[0] and
-                # The left side of the sphere meets the right side of the platform
-                sphere_position[0] <= platform_position[2] and
-                # The bottom of the sphere hits the surface of the platform but is not below the platform
-                platform_position[1] <= sphere_position[3] <= platform_position[3]):
-            return True
-        else:
-            return False
-
-    def hit_left_target(self, sphere_position):
-        """
-        Return True if the sphere hits the left target and False otherwise.
-        :param sphere_position: The position of the sphere
-        :return: True if the sphere hits the left target and False otherwise
-        """
-        left_target_position = self.master.coords(self.target_left.circle_1st)
-        # The sphere is inside the target circle
-        if (sphere_position[0] >= left_target_position[0] and
-                sphere_position[1] >= left_target_position[1] and
-                sphere_position[2] <= left_target_position[2] and
-                sphere_position[3] <= left_target_position[3]):
-            return True
-        else:
-            return False
+        self.state = sphere
+        self.sphere = pool.acquire("oval", sphere.bounds(), fill="#f765b3")
 
-    def hit_right_target(self, sphere_position):
+    def draw(self):
         """
-        Return True if the sphere hits the right target and False otherwise.
-        :param sphere_position: The position of the sphere
-        :return: True if the sphere hits the right target and False otherwise
+        Move the drawing to the position of the sphere.
         """
-        right_target_position = self.master.coords(self.target_right.circle_1st)
-        # The sphere is inside the target circle
-        if (sphere_position[0] >= right_target_position[0] and
-                sphere_position[1] >= right_target_position[1] and
-                sphere_position[2] <= right_target_position[2] and
-                sphere_position[3] <= right_target_position[3]):
-            return True
-        else:
-            return False
+        self.master.coords(self.sphere, *self.state.bounds())
 
 
 class Target:
@@ -782,29 +1109,42 @@ class Target:
     A target for the moving sphere
     """
 
-    def __init__(self, master, position_x, position_y):
+    def __init__(self, master, pool, position_x, position_y):
         """
         Construct a target for the moving sphere.
         :param master: The parent to place the target object
+        :param pool (ItemPool): The pool of canvas items of the game
         :param position_x: The factor-x of the position of the target
         :param position_y: The factor-y of the position of the target
         """
         self.master = master
         self.position_x = position_x
         self.position_y = position_y
-        self.target = self.master.create_oval(0, 0, TARGET_DIAMETER, TARGET_DIAMETER, fill="#ff0000")
-        self.circle_1st = self.master.create_oval(0, 0, TARGET_DIAMETER * 3, TARGET_DIAMETER * 3,
-                                                  outline="#ff2626", width=6)
-        self.circle_2nd = self.master.create_oval(0, 0, TARGET_DIAMETER * 6, TARGET_DIAMETER * 6,
-                                                  outline="#ff4747", width=3)
-        self.circle_3rd = self.master.create_oval(0, 0, TARGET_DIAMETER * 9, TARGET_DIAMETER * 9,
-                                                  outline="#ff4747", width=2)
-        self.master.move(self.target, self.position_x, self.position_y)
-        self.master.move(self.circle_1st, self.position_x - TARGET_DIAMETER, self.position_y - TARGET_DIAMETER)
-        self.master.move(self.circle_2nd,
-                         self.position_x - TARGET_DIAMETER * 2.5, self.position_y - TARGET_DIAMETER * 2.5)
-        self.master.move(self.circle_3rd,
-                         self.position_x - TARGET_DIAMETER * 4, self.position_y - TARGET_DIAMETER * 4)
+        self.hit = False
+        self.target = pool.acquire("oval", self.square(0, 1), fill="#ff0000")
+        self.circle_1st = pool.acquire("oval", self.square(-1, 3), outline="#ff2626", width=6)
+        self.circle_2nd = pool.acquire("oval", self.square(-2.5, 6), outline="#ff4747", width=3)
+        self.circle_3rd = pool.acquire("oval", self.square(-4, 9), outline="#ff4747", width=2)
+
+    def square(self, offset, size):
+        """
+        Return the coordinates of a circle of the target.
+        :param offset (float): The offset of the circle from the position of the target in target diameters
+        :param size (float): The diameter of the circle in target diameters
+        :return (tuple): The coordinates of the square bounding the circle
+        """
+        left = self.position_x + TARGET_DIAMETER * offset
+        top = self.position_y + TARGET_DIAMETER * offset
+        return left, top, left + TARGET_DIAMETER * size, top + TARGET_DIAMETER * size
+
+    def draw(self, hit):
+        """
+        Light the target up once it is hit.
+        :param hit (bool): True if the sphere has hit the target and False otherwise
+        """
+        if hit and not self.hit:
+            self.hit = True
+            target_hit_effects(self)
 
 
 class Platform:
@@ -812,146 +1152,83 @@ class Platform:
     A platform to catch the sphere and make it bounce back
     """
 
-    def __init__(self, master):
+    def __init__(self, master, pool, platform):
         """
-        Construct of platform to catch the sphere.
+        Construct the drawing of the platform to catch the sphere.
         :param master: The parent to place the platform object
+        :param pool (ItemPool): The pool of canvas items of the game
+        :param platform (Box): The state of the platform
         """
         self.master = master
-        self.platform = self.master.create_rectangle(0, 0, 150, 10, fill="#0faa01")
-        self.master.move(self.platform, 510, 600)
-        self.direction_x = 0
+        self.state = platform
+        self.platform = pool.acquire("rectangle", platform.bounds(), fill="#0faa01")
         self.master.bind_all("<KeyPress-Left>", self.move_left)
         self.master.bind_all("<KeyPress-Right>", self.move_right)
         self.master.bind_all("<KeyPress-Down>", self.pause)
 
-    def move(self):
+    def draw(self):
         """
-        Pause the motion of the platform when it reaches the left or right boundary.
+        Move the drawing to the position of the platform.
         """
-        try:
-            self.master.move(self.platform, self.direction_x, 0)
-            platform_position = self.master.coords(self.platform)
-            # The platform hits the left boundary.
-            if platform_position[0] <= 0:
-                self.direction_x = 0
-            # The platform hits the right boundary.
-            if platform_position[2] >= WINFO_WIDTH:
-                self.direction_x = 0
-        except TclError:
-            pass
+        self.master.coords(self.platform, *self.state.bounds())
 
     def pause(self, event):
         """
         Pause the platform motion.
         """
-        self.direction_x = 0
+        self.state.velocity.x = 0
 
     def move_left(self, event):
         """
         Set the platform direction to left.
         """
-        self.direction_x = -4
+        self.state.velocity.x = -4
 
     def move_right(self, event):
         """
         Set the platform direction to right.
         """
-        self.direction_x = 4
+        self.state.velocity.x = 4
+
+
+class QuickGameSession(GameSession):
+    """
+    The window of Paddle Ball with a single player
+    """
+
+    def __init__(self):
+        super().__init__("Paddle Ball - Single Player", SingleGame,
+                         {"lost": quick_game_lose_alert, "won": quick_game_win_alert})
+        self.target_left = None
+        self.target_right = None
+
+    def build(self):
+        return [self.canvas.create_text(590, 400, text="<Left Arrow>, <Right Arrow> and <Down Arrow> buttons "
+                                                       "make the paddle move left, move right and pause.",
+                                        font="Arial 18"),
+                self.canvas.create_text(580, 500, fill="#ea3a09", text="Click to start!",
+                                        font="Times 30 bold")]
+
+    def place(self):
+        platform = Platform(self.canvas, self.pool, self.game.platform)
+        self.target_left = Target(self.canvas, self.pool, 285, 100)
+        self.target_right = Target(self.canvas, self.pool, 855, 100)
+        return [Sphere(self.canvas, self.pool, self.game.sphere), platform]
+
+    def draw(self):
+        super().draw()
+        self.target_left.draw(self.game.left_hit)
+        self.target_right.draw(self.game.right_hit)
+
+
+quick_game_session = QuickGameSession()
 
 
 def quick_game():
     """
-    1. Create a new top-level window.
-    2. Initiate a canvas for the game.
-    3. Instantiate new widgets on the canvas
-    4. Call game_start function upon clicking.
-    """
-    global quick_game_temp
-    quick_game_temp = Toplevel()
-    quick_game_temp.geometry("1140x690")
-    quick_game_temp.resizable(0, 0)
-    quick_game_temp.title("Paddle Ball - Single Player")
-    canvas_quick_game = Canvas(quick_game_temp,
-                               width=WINFO_WIDTH, height=WINFO_HEIGHT,
-                               bd=0, highlightthickness=0)
-    canvas_quick_game.place(x=0, y=0)
-    canvas_quick_game.create_text(590, 400, text="<Left Arrow>, <Right Arrow> and <Down Arrow> buttons "
-                                                 "make the paddle move left, move right and pause.",
-                                  font="Arial 18")
-    canvas_quick_game.create_text(580, 500, fill="#ea3a09", text="Click to start!",
-                                  font="Times 30 bold")
-    platform = Platform(canvas_quick_game)
-    target_left = Target(canvas_quick_game, 285, 100)
-    target_right = Target(canvas_quick_game, 855, 100)
-    Sphere(canvas_quick_game, platform, target_left, target_right)
-    quick_game_temp.bind("<Button-1>", quick_game_start)
-
-
-def quick_game_start(event):
-    """
-    Unveil the game.
-    """
-    global quick_game_continue
-    quick_game_continue = True
-    quick_game_temp.destroy()
-    quick_game_action()
-
-
-def quick_game_action():
-    """
-    1. Re-initiate the canvas and its widgets.
-    2. Keep the game in motion until certain conditions are met.
-    3. End the game with prompt up windows and reset variables.
-    """
-    global quick_game_continue
-    global left_hit
-    global right_hit
-    global bottom_hit
-    quick_game_single = Toplevel()
-    quick_game_single.geometry("1140x690")
-    quick_game_single.resizable(0, 0)
-    quick_game_single.title("Paddle Ball - Single Player")
-    canvas_quick_game = Canvas(quick_game_single,
-                               width=WINFO_WIDTH, height=WINFO_HEIGHT,
-                               bd=0, highlightthickness=0)
-    canvas_quick_game.place(x=0, y=0)
-    platform = Platform(canvas_quick_game)
-    target_left = Target(canvas_quick_game, 285, 100)
-    target_right = Target(canvas_quick_game, 855, 100)
-    sphere = Sphere(canvas_quick_game, platform, target_left, target_right)
-    while quick_game_continue:
-        sphere.move()
-        platform.move()
-        try:
-            if left_hit:
-                target_hit_effects(target_left)
-        except TclError:
-            pass
-        try:
-            if right_hit:
-                target_hit_effects(target_right)
-        except TclError:
-            pass
-        if bottom_hit:
-            time.sleep(0.5)
-            quick_game_lose_alert()
-            quick_game_single.destroy()
-            left_hit = False
-            right_hit = False
-            bottom_hit = False
-        if left_hit and right_hit:
-            time.sleep(0.5)
-            quick_game_win_alert()
-            quick_game_single.destroy()
-            left_hit = False
-            right_hit = False
-        try:
-            quick_game_single.update_idletasks()
-            quick_game_single.update()
-        except TclError:
-            quick_game_continue = False
-        time.sleep(0.01)
+    Open the single player game at its splash screen, which starts the game upon clicking.
+    """
+    quick_game_session.open()
 
 
 # ------ Long Question Game (Paddle Ball Game with Double Players) ------ #
@@ -962,270 +1239,194 @@ class Ball:
     A ball to keeping bouncing between the two paddles
     """
 
-    def __init__(self, master, left_paddle, right_paddle):
+    def __init__(self, master, pool, ball):
         """
-        Construct a ball in motion.
+        Construct the drawing of a ball in motion.
         :param master: The parent to hold the ball object
-        :param left_paddle: An instance of the LeftPaddle Class
-        :param right_paddle: An instance of the RightPaddle Class
+        :param pool (ItemPool): The pool of canvas items of the game
+        :param ball (Box): The state of the ball
         """
         self.master = master
-        self.left_paddle = left_paddle
-        self.right_paddle = right_paddle
-        self.ball = self.master.create_oval(0, 0, 15, 15, fill="#cf11f9")
-        self.master.move(self.ball, 563, 330)
-        self.direction_x = random.choice([-4, 4])
-        self.direction_y = random.choice([-4, 4])
+        self.state = ball
+        self.ball = pool.acquire("oval", ball.bounds(), fill="#cf11f9")
 
-    def move(self):
+    def draw(self):
         """
-        Reverse the direction when hitting boundaries and
-        reset relevant variables if there is a winning situation.
+        Move the drawing to the position of the ball.
         """
-        global left_win
-        global right_win
-        try:
-            self.master.move(self.ball, self.direction_x, self.direction_y)
-            ball_position = self.master.coords(self.ball)
-            # The ball hits the top edge of the board.
-            if ball_position[1] <= 0:
-                self.direction_y = 4
-            # The ball hits the bottom edge of the board.
-            if ball_position[3] >= WINFO_HEIGHT:
-                self.direction_y = -4
-            # The ball hits the left boundary of the board.
-            if ball_position[0] <= 0:
-                right_win = True
-            # The ball hits the right boundary of the board.
-            if ball_position[2] >= WINFO_WIDTH:
-                left_win = True
-            if self.hit_left_paddle(ball_position):
-                self.direction_x = 4
-            if self.hit_right_paddle(ball_position):
-                self.direction_x = -4
-        except TclError:
-            pass
-
-    def hit_left_paddle(self, ball_position):
-        """
-        Check if the ball is caught by the left paddle.
-        :param ball_position: The position of the ball
-        :return: True if if the ball is caught by the left paddle and False otherwise.
-        """
-        left_paddle_position = self.master.coords(self.left_paddle.left_paddle)
-        # The bottom of the ball meets the top of the paddle
-        if (ball_position[3] >= left_paddle_position[1] and
-                # The top of the ball meets the bottom of the paddle
-                ball_position[1] <= left_paddle_position[3] and
-                # The ball touches the surface of the paddle
-                ball_position[0] <= left_paddle_position[2]):
-            return True
-        return False
-
-    def hit_right_paddle(self, ball_position):
-        """
-        Check if the ball is caught by the right paddle.
-        :param ball_position: The position of the ball
-        :return: True if if the ball is caught by the left paddle and False otherwise.
-        """
-        right_paddle_position = self.master.coords(self.right_paddle.right_paddle)
-        # The bottom of the ball meets the top of the paddle
-        if (ball_position[3] >= right_paddle_position[1] and
-                # The top of the ball meets the bottom of the paddle
-                ball_position[1] <= right_paddle_position[3] and
-                # The ball touches the surface of the paddle
-                ball_position[2] >= right_paddle_position[0]):
-            return True
-        return False
+        self.master.coords(self.ball, *self.state.bounds())
 
 
 class LeftPaddle:
     """
     A left paddle featured with a colour of red
     """
-    def __init__(self, master):
+    def __init__(self, master, pool, paddle):
         """
         Construct a paddle for the player on the red side.
         :param master: The parent to position the paddle
+        :param pool (ItemPool): The pool of canvas items of the game
+        :param paddle (Box): The state of the paddle
         """
         self.master = master
-        self.left_paddle = self.master.create_rectangle(0, 0, 20, 100, fill="#ff2828")
-        self.master.move(self.left_paddle, 0, 290)
-        self.direction_y = 0
+        self.state = paddle
+        self.left_paddle = pool.acquire("rectangle", paddle.bounds(), fill="#ff2828")
         self.master.bind_all("w", self.move_up)
         self.master.bind_all("s", self.move_down)
         self.master.bind_all("a", self.pause)
 
-    def move(self):
+    def draw(self):
         """
-        Reverse the moving direction when the paddle hits the top or bottom boundary.
+        Move the drawing to the position of the paddle.
         """
-        try:
-            self.master.move(self.left_paddle, 0, self.direction_y)
-            left_paddle_position = self.master.coords(self.left_paddle)
-            # Pause the paddle if it reaches the top end of the screen
-            if left_paddle_position[1] <= 0:
-                self.direction_y = 0
-            # Pause the paddle if it reaches the bottom end of the screen
-            if left_paddle_position[3] >= WINFO_HEIGHT:
-                self.direction_y = 0
-        except TclError:
-            pass
+        self.master.coords(self.left_paddle, *self.state.bounds())
 
     def pause(self, event):
         """
         Pause the paddle motion.
         """
-        self.direction_y = 0
+        self.state.velocity.y = 0
 
     def move_up(self, event):
         """
         Set the paddle direction to North.
         """
-        self.direction_y = -3
+        self.state.velocity.y = -3
 
     def move_down(self, event):
         """
         Set the paddle direction to South.
         """
-        self.direction_y = 3
+        self.state.velocity.y = 3
 
 
 class RightPaddle:
     """
     A right paddle featured with a colour of blue
     """
-    def __init__(self, master):
+    def __init__(self, master, pool, paddle):
         """
         Construct a paddle for the player on the blue side.
         :param master: The parent to position the paddle
+        :param pool (ItemPool): The pool of canvas items of the game
+        :param paddle (Box): The state of the paddle
         """
         self.master = master
-        self.right_paddle = self.master.create_rectangle(0, 0, 20, 100, fill="#5e3aff")
-        self.master.move(self.right_paddle, 1120, 290)
-        self.direction_y = 0
+        self.state = paddle
+        self.right_paddle = pool.acquire("rectangle", paddle.bounds(), fill="#5e3aff")
         self.master.bind_all("<KeyPress-Up>", self.move_up)
         self.master.bind_all("<KeyPress-Down>", self.move_down)
         self.master.bind_all("<KeyPress-Right>", self.pause)
 
-    def move(self):
+    def draw(self):
         """
-        Reverse the moving direction when the paddle hits the top or bottom boundary.
+        Move the drawing to the position of the paddle.
         """
-        try:
-            self.master.move(self.right_paddle, 0, self.direction_y)
-            right_paddle_position = self.master.coords(self.right_paddle)
-            # Pause the paddle if it reaches the top end of the screen
-            if right_paddle_position[1] <= 0:
-                self.direction_y = 0
-            # Pause the paddle if it reaches the bottom end of the screen
-            if right_paddle_position[3] >= WINFO_HEIGHT:
-                self.direction_y = 0
-        except TclError:
-            pass
+        self.master.coords(self.right_paddle, *self.state.bounds())
 
     def pause(self, event):
         """
         Pause the paddle motion.
         """
-        self.direction_y = 0
+        self.state.velocity.y = 0
 
     def move_up(self, event):
-        self.direction_y = -3
+        self.state.velocity.y = -3
 
     def move_down(self, event):
-        self.direction_y = 3
+        self.state.velocity.y = 3
+
+
+class LongGameSession(GameSession):
+    """
+    The window of Paddle Ball with two players
+    """
+
+    def __init__(self):
+        super().__init__("Paddle Ball - Double Player", DoubleGame,
+                         {"red": long_game_red_win, "blue": long_game_blue_win})
+
+    def build(self):
+        self.canvas.create_line(570, 0, 570, WINFO_HEIGHT, fill="#000")
+        return [self.canvas.create_text(590, 200, text="<W>, <S> and <A> buttons make the "
+                                                       "red paddle move up, move down and pause.",
+                                        font="Arial 18"),
+                self.canvas.create_text(590, 240, text="<Up Arrow>, <Down Arrow> and <Right Arrow> buttons "
+                                                       "make the blue paddle move up, move down and pause.",
+                                        font="Arial 18"),
+                self.canvas.create_text(575, 460, fill="#ea3a09", text="Click to start!",
+                                        font="Times 30 bold")]
+
+    def place(self):
+        return [Ball(self.canvas, self.pool, self.game.ball),
+                LeftPaddle(self.canvas, self.pool, self.game.left_paddle),
+                RightPaddle(self.canvas, self.pool, self.game.right_paddle)]
+
+
+long_game_session = LongGameSession()
 
 
 def long_game():
     """
-    1. Create a new top-level window.
-    2. Initiate a canvas for the game.
-    3. Instantiate new widgets on the canvas
-    4. Call game_start function upon clicking.
-    """
-    global long_game_temp
-    long_game_temp = Toplevel()
-    long_game_temp.geometry("1140x690")
-    long_game_temp.resizable(0, 0)
-    long_game_temp.title("Paddle Ball - Double Player")
-    canvas_long_game = Canvas(long_game_temp,
-                              width=WINFO_WIDTH, height=WINFO_HEIGHT,
-                              bd=0, highlightthickness=0)
-    canvas_long_game.place(x=0, y=0)
-    canvas_long_game.create_line(570, 0, 570, WINFO_HEIGHT, fill="#000")
-    canvas_long_game.create_text(590, 200, text="<W>, <S> and <A> buttons make the "
-                                                "red paddle move up, move down and pause.",
-                                 font="Arial 18")
-    canvas_long_game.create_text(590, 240, text="<Up Arrow>, <Down Arrow> and <Right Arrow> buttons "
-                                                "make the blue paddle move up, move down and pause.",
-                                 font="Arial 18")
-    canvas_long_game.create_text(575, 460, fill="#ea3a09", text="Click to start!",
-                                 font="Times 30 bold")
-    left_paddle = LeftPaddle(canvas_long_game)
-    right_paddle = RightPaddle(canvas_long_game)
-    Ball(canvas_long_game, left_paddle, right_paddle)
-    long_game_temp.bind("<Button-1>", long_game_start)
-
-
-def long_game_start(event):
-    """
-    Unveil the game.
-    """
-    global long_game_continue
-    long_game_continue = True
-    long_game_temp.destroy()
-    long_game_action()
-
-
-def long_game_action():
-    """
-    1. Re-initiate the canvas and its widgets.
-    2. Keep the game in motion until certain conditions are met.
-    3. End the game with prompt up windows and reset variables.
-    """
-    global long_game_continue
-    global left_win
-    global right_win
-    long_game_double = Toplevel()
-    long_game_double.geometry("1140x690")
-    long_game_double.resizable(0, 0)
-    long_game_double.title("Paddle Ball - Double Player")
-    canvas_long_game = Canvas(long_game_double,
-                              width=WINFO_WIDTH, height=WINFO_HEIGHT,
-                              bd=0, highlightthickness=0)
-    canvas_long_game.place(x=0, y=0)
-    canvas_long_game.create_line(570, 0, 570, WINFO_HEIGHT, fill="#000")
-    left_paddle = LeftPaddle(canvas_long_game)
-    right_paddle = RightPaddle(canvas_long_game)
-    ball = Ball(canvas_long_game, left_paddle, right_paddle)
-    while long_game_continue:
-        ball.move()
-        left_paddle.move()
-        right_paddle.move()
-        if left_win:
-            time.sleep(0.5)
-            long_game_red_win()
-            long_game_double.destroy()
-            left_win = False
-        if right_win:
-            time.sleep(0.5)
-            long_game_blue_win()
-            long_game_double.destroy()
-            right_win = False
-        try:
-            long_game_double.update_idletasks()
-            long_game_double.update()
-        except TclError:
-            long_game_continue = False
-        time.sleep(0.01)
+    Open the double player game at its splash screen, which starts the game upon clicking.
+    """
+    long_game_session.open()
+
+
+# ------ Queue Types ------ #
+
+
+# The question queues displayed side by side, each adding a column to the window
+QUEUE_TYPES = [
+    QueueType("quick", "< 2 mins with a tutor", "#3c763d", "#dff0d8", "#5cb85c",
+              ["Syntax errors", "Interpreting error output", "Assignment interpretation",
+               "Assignment submission issues"],
+              quick_game, "#f765b3"),
+    QueueType("long", "> 2 mins with a tutor", "#31708f", "#d9edf7", "#5bc0de",
+              ["Open ended questions:", "How to start a problem", "How to improve code", "Debugging",
+               "Assignment help"],
+              long_game, "#ce6aed"),
+]
+
+# Instantiation
+queue_client = None
+queue_log = None
+history_store = None
+registry = QueueRegistry()
+if SERVER_ADDRESS:
+    # The queues are held by the queue server, this terminal only mirrors them.
+    server_host, server_port = SERVER_ADDRESS.rsplit(":", 1)
+    queue_client = QueueClient(server_host, int(server_port))
+    for queue_type in QUEUE_TYPES:
+        registry.add(RemoteQuestionQueue(queue_type.name, queue_client))
+    queue_client.sync()
+    if HISTORY_PATH:
+        print("CLASS_QUEUE_HISTORY is ignored with CLASS_QUEUE_SERVER, start queue_server.py with --history instead.")
+else:
+    for queue_type in QUEUE_TYPES:
+        registry.add(QuestionQueue(queue_type.name))
+    queue_log = QueueLog(LOG_PATH)
+    try:
+        queue_log.recover(registry)
+    except OSError as error:
+        print("The queues are not saved as the log cannot be opened: {}".format(error))
+        queue_log = None
+    if HISTORY_PATH:
+        history_store = HistoryStore(HISTORY_PATH)
+        history_store.attach(registry)
+QueueMetrics(metrics).attach(registry)
+if METRICS_PORT:
+    metrics.serve(int(METRICS_PORT))
 
 
 # ------ GUI Interface (Basic universal containers and displays) ------ #
 
 
+window_width = COLUMN_SPACING * len(QUEUE_TYPES)
+root.geometry("{}x{}".format(window_width, WINFO_HEIGHT + BATCH_HEIGHT))
+
 # Important Notice (featured with a yellow background)
-frame_important = Frame(root, width=WINFO_WIDTH, height=100, bg="#fefbed")
+frame_important = Frame(root, width=window_width, height=100, bg="#fefbed")
 frame_important.place(x=0, y=0)
 
 label_important_heading = Label(frame_important)
@@ -1234,197 +1435,30 @@ label_important_heading.config(text="Announcement Board")
 label_important_heading.place(x=15, y=10)
 
 label_important_content = Label(frame_important)
-label_important_content.config(bg="#fefbed", wraplength=1110, justify=LEFT)
+label_important_content.config(bg="#fefbed", wraplength=window_width - 30, justify=LEFT)
 label_important_content.config(text="Yesterday morning the marks and feedback for Assignment 3 were released on "
                                     "Blackboard, but there was a bug which was causing some students to be unable to "
                                     "view their feedback. The bug has been fixed and hopefully all students can now "
                                     "see their feedback.")
 label_important_content.place(x=15, y=40)
 
-# Quick Question Heading (featured with a green background)
-frame_quick_questions = Frame(root, width=530, height=100, bg="#dff0d8")
-frame_quick_questions.place(x=20, y=120)
-
-label_quick_questions = Label(frame_quick_questions)
-label_quick_questions.config(fg="#3c763d", bg="#dff0d8", font="Helvetica 25")
-label_quick_questions.config(text="Quick Questions")
-label_quick_questions.place(x=150, y=10)
-
-# Quick Question Subtitle (featured with a font colour of grey on a green background)
-label_quick_subs = Label(frame_quick_questions)
-label_quick_subs.config(fg="#666", bg="#dff0d8", font="Arial 14 italic")
-label_quick_subs.config(text="< 2 mins with a tutor")
-label_quick_subs.place(x=170, y=60)
-
-# Long Question Heading (featured with a blue background)
-frame_long_questions = Frame(root, width=530, height=100, bg="#d9edf7")
-frame_long_questions.place(x=590, y=120)
-
-label_long_questions = Label(frame_long_questions)
-label_long_questions.config(fg="#31708f", bg="#d9edf7", font="Helvetica 25")
-label_long_questions.config(text="Long Questions")
-label_long_questions.place(x=150, y=10)
-
-# Long Question Subtitle (featured with a font colour of grey on a blue background)
-label_long_subs = Label(frame_long_questions)
-label_long_subs.config(fg="#666", bg="#d9edf7", font="Arial 14 italic")
-label_long_subs.config(text="> 2 mins with a tutor")
-label_long_subs.place(x=170, y=60)
-
-# Quick Question Instructions (contains 4 bullet points)
-frame_quick_instructions = Frame(root, width=530, height=190)
-frame_quick_instructions.place(x=20, y=240)
-
-label_quick_instruction_heading = Label(frame_quick_instructions)
-label_quick_instruction_heading.config(text="Some examples of quick questions:")
-label_quick_instruction_heading.place(x=0, y=0)
-
-quick_instructions = ["    \u2022 Syntax errors",
-                      "    \u2022 Interpreting error output",
-                      "    \u2022 Assignment interpretation",
-                      "    \u2022 Assignment submission issues"]
-for i in range(len(quick_instructions)):
-    label_instruction = Label(frame_quick_instructions)
-    label_instruction.config(text=quick_instructions[i])
-    label_instruction.place(x=0, y=20 * (i + 1))
-
-# Request Quick Help Button (featured with a font colour of white on a green button background)
-button_quick = Button(frame_quick_instructions)
-button_quick.config(fg="#fff", bg="#5cb85c", highlightbackground="#5cb85c", padx=10, pady=10)
-button_quick.config(cursor="hand2", command=quick_get_name)
-button_quick.config(text="Request Quick Help")
-button_quick.place(x=180, y=135)
-
-# Game Button on the Quick Help Section (featured with a font colour of white on a green button background)
-button_quick_game = Button(frame_quick_instructions)
-button_quick_game.config(fg="#fff", bg="#f765b3", highlightbackground="#f765b3", padx=10, pady=10)
-button_quick_game.config(cursor="hand2", command=quick_game)
-button_quick_game.config(text="Play Game")
-button_quick_game.place(x=380, y=135)
-
-# Long Question Instructions (contains 4 bullet points)
-frame_long_instructions = Frame(root, width=530, height=210)
-frame_long_instructions.place(x=590, y=240)
-
-label_long_instruction_heading = Label(frame_long_instructions)
-label_long_instruction_heading.config(text="Some examples of long questions:")
-label_long_instruction_heading.place(x=0, y=0)
-
-long_instructions = ["    \u2022 Open ended questions:",
-                     "    \u2022 How to start a problem",
-                     "    \u2022 How to improve code",
-                     "    \u2022 Debugging",
-                     "    \u2022 Assignment help"]
-for i in range(len(long_instructions)):
-    label_instruction = Label(frame_long_instructions)
-    label_instruction.config(text=long_instructions[i])
-    label_instruction.place(x=0, y=20 * (i + 1))
-
-# Request Long Help Button (featured with a font colour of white on a blue button background)
-button_long = Button(frame_long_instructions)
-button_long.config(fg="#fff", bg="#5bc0de", highlightbackground="#5bc0de", padx=10, pady=10)
-button_long.config(cursor="hand2", command=long_get_name)
-button_long.config(text="Request Long Help")
-button_long.place(x=180, y=155)
-
-# Game Button on the Long Help Section (featured with a font colour of white on a blue button background)
-button_long_game = Button(frame_long_instructions)
-button_long_game.config(fg="#fff", bg="#ce6aed", highlightbackground="#ce6aed", padx=10, pady=10)
-button_long_game.config(cursor="hand2", command=long_game)
-button_long_game.config(text="Play Game")
-button_long_game.place(x=380, y=155)
-
-# --- Separators and the content within --- #
-
-# First separators for both sections
-button_left_separator = Frame(root, width=530, height=2, bg="#dddcd4")
-button_left_separator.place(x=20, y=430)
-
-button_right_separator = Frame(root, width=530, height=2, bg="#dddcd4")
-button_right_separator.place(x=590, y=450)
-
-frame_quick_average = Frame(root, width=530, height=46)
-frame_quick_average.place(x=20, y=432)
-
-label_quick_average = Label(frame_quick_average)
-label_quick_average.config(textvariable=quick_average)
-label_quick_average.place(x=0, y=10)
-
-frame_long_average = Frame(root, width=530, height=46)
-frame_long_average.place(x=590, y=452)
-
-label_long_average = Label(frame_long_average)
-label_long_average.config(textvariable=long_average)
-label_long_average.place(x=0, y=10)
-
-# Second separators for both sections
-average_left_separator = Frame(root, width=530, height=2, bg="#dddcd4")
-average_left_separator.place(x=20, y=478)
-
-average_right_separator = Frame(root, width=530, height=2, bg="#dddcd4")
-average_right_separator.place(x=590, y=498)
-
-frame_quick_heading = Frame(root, width=530, height=38)
-frame_quick_heading.place(x=20, y=480)
-
-label_quick_heading = Label(frame_quick_heading)
-label_quick_heading.config(font="Helvetica 12 bold")
-label_quick_heading.config(text="#" + " " * 5 + "Name" + " " * 20 + "Questions Asked" + " " * 10 + "Time")
-label_quick_heading.place(x=0, y=7)
-
-button_quick_timing = Button(frame_quick_heading, width=14)
-button_quick_timing.config(bg="#c0c1c4", highlightbackground="#c0c1c4", padx=10, pady=2)
-button_quick_timing.config(cursor="hand2", command=quick_toggle)
-button_quick_timing.config(text="Precise Timing Off")
-button_quick_timing.place(x=380, y=4)
-
-frame_long_heading = Frame(root, width=530, height=38)
-frame_long_heading.place(x=590, y=500)
-
-label_long_heading = Label(frame_long_heading)
-label_long_heading.config(font="Helvetica 12 bold")
-label_long_heading.config(text="#" + " " * 5 + "Name" + " " * 20 + "Questions Asked" + " " * 10 + "Time")
-label_long_heading.place(x=0, y=7)
-
-button_long_timing = Button(frame_long_heading, width=14)
-button_long_timing.config(bg="#c0c1c4", highlightbackground="#c0c1c4", padx=10, pady=2)
-button_long_timing.config(cursor="hand2", command=long_toggle)
-button_long_timing.config(text="Precise Timing Off")
-button_long_timing.place(x=380, y=4)
-
-# Third separators for both sections
-heading_left_separator = Frame(root, width=530, height=2, bg="#dddcd4")
-heading_left_separator.place(x=20, y=518)
-
-heading_right_separator = Frame(root, width=530, height=2, bg="#dddcd4")
-heading_right_separator.place(x=590, y=538)
-
-# ---  Quick Question Queue Frame And Scrollbar --- #
-
-canvas_quick_queue = Canvas(root, width=515, height=150, bd=0, highlightthickness=0)
-canvas_quick_queue.place(x=20, y=520)
-
-frame_quick_queue = Frame(canvas_quick_queue, width=515, height=150)
-frame_quick_queue.place(x=0, y=0)
-
-bar_quick_queue = Scrollbar(root, orient="vertical", command=canvas_quick_queue.yview)
-canvas_quick_queue.config(yscrollcommand=bar_quick_queue.set)
-bar_quick_queue.place(x=535, y=520, height=150)
-canvas_quick_queue.create_window((0, 0), window=frame_quick_queue, anchor=NW)
-frame_quick_queue.bind("<Configure>", frame_quick_configure)
-
-# --- Long Question Queue Frame And Scrollbar --- #
-
-canvas_long_queue = Canvas(root, width=515, height=120, bd=0, highlightthickness=0)
-canvas_long_queue.place(x=590, y=540)
-
-frame_long_queue = Frame(canvas_long_queue, width=515, height=120)
-frame_long_queue.place(x=0, y=0)
-
-bar_long_queue = Scrollbar(root, orient="vertical", command=canvas_long_queue.yview)
-canvas_long_queue.config(yscrollcommand=bar_long_queue.set)
-bar_long_queue.place(x=1090, y=540, height=120)
-canvas_long_queue.create_window((0, 0), window=frame_long_queue, anchor=NW)
-frame_long_queue.bind("<Configure>", frame_long_configure)
-
-root.mainloop()
+# Question Queue Columns (one per queue type, side by side)
+sections = {}  # The column of every question queue indexed by the name of the queue
+for column, queue_type in enumerate(QUEUE_TYPES):
+    sections[queue_type.name] = QueueSection(queue_type, registry[queue_type.name], 20 + column * COLUMN_SPACING)
+
+# --- Recovered Queues And Closing --- #
+
+# Display the recovered queues straight away and save them when the window is closed.
+for section in sections.values():
+    scheduler.mark_dirty(section.refresh)
+root.protocol("WM_DELETE_WINDOW", close)
+if queue_client is not None:
+    root.after(RECEIVE_PERIOD, receive)
+if METRICS_PATH:
+    root.after(METRICS_PERIOD, write_metrics)
+if PROFILE_PATH:
+    root.after(PROFILE_PERIOD, write_profile)
+
+if __name__ == "__main__":
+    root.mainloop()
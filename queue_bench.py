@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Programming Class Queue - Benchmarks
+
+Drives the queue core through lab workloads and reports per-operation latency percentiles and memory.
+Run with --tk to also time the redraw of the quick queue in the GUI, adding --xvfb on machines without a display.
+"""
+
+__author__ = "Steven Yulong Yan"
+
+
+# ------ Imported Modules ------ #
+
+
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from queue_core import QuestionQueue
+
+
+# ------ Global Variables ------ #
+
+
+PERCENTILES = (50, 90, 99)
+CLASS_START = 1500000000  # The time at which every simulated class starts
+
+
+# ------ Recording ------ #
+
+
+class Recorder:
+    """
+    The latency samples of every timed operation
+    """
+
+    def __init__(self):
+        """
+        Construct an empty recorder.
+        """
+        self.samples = {}
+
+    def time(self, operation, function, *args):
+        """
+        Call a function and record how long it took.
+        :param operation (str): The name under which the latency is recorded
+        :param function: The function to call
+        :param args: The arguments of the function
+        :return: The result of the function
+        """
+        start = time.perf_counter_ns()
+        result = function(*args)
+        self.samples.setdefault(operation, []).append(time.perf_counter_ns() - start)
+        return result
+
+    def report(self, title, memory=None):
+        """
+        Print the latency percentiles of every operation.
+        :param title (str): The title of the report
+        :param memory (tuple): The current and peak number of bytes allocated by the workload
+        """
+        print(title)
+        print("    {:<22}{:>9}".format("operation", "count") +
+              "".join("{:>11}".format("p{}".format(p)) for p in PERCENTILES) + "{:>11}".format("max"))
+        for operation, samples in self.samples.items():
+            samples.sort()
+            cells = [samples[min(len(samples) * p // 100, len(samples) - 1)] for p in PERCENTILES]
+            cells.append(samples[-1])
+            print("    {:<22}{:>9}".format(operation, len(samples)) +
+                  "".join("{:>9.1f}us".format(cell / 1000) for cell in cells))
+        if memory is not None:
+            print("    memory: {:.1f} KiB retained, {:.1f} KiB peak".format(memory[0] / 1024, memory[1] / 1024))
+        print()
+
+
+class NullRecorder(Recorder):
+    """
+    A recorder which only calls the functions, used while measuring memory
+    """
+
+    def time(self, operation, function, *args):
+        return function(*args)
+
+
+def run(title, workload, *args):
+    """
+    Run a workload once for its latencies and once more under tracemalloc for its memory.
+    :param title (str): The title of the report
+    :param workload: The function running the workload with a recorder as its first argument
+    :param args: The remaining arguments of the workload
+    """
+    recorder = Recorder()
+    workload(recorder, *args)
+    tracemalloc.start()
+    queue = workload(NullRecorder(), *args)
+    memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del queue
+    recorder.report(title, memory)
+
+
+def read(recorder, queue, now, repeat=20):
+    """
+    Time the ordering of the queue and the computation of its average wait time.
+    :param recorder: The recorder of the latencies
+    :param queue: The question queue
+    :param now (int): The current time
+    :param repeat (int): The number of times each is timed
+    """
+    for _ in range(repeat):
+        recorder.time("ordering", queue.waiting.get_queue)
+        recorder.time("average", queue.waiting.total_wait, now)
+        recorder.time("approximate display", queue.approximate_display, now)
+
+
+# ------ Workloads ------ #
+
+
+def burst(recorder, size):
+    """
+    Join a class full of students within the first minutes of the class.
+    :param recorder: The recorder of the latencies
+    :param size (int): The number of students joining
+    :return (QuestionQueue): The question queue
+    """
+    queue = QuestionQueue("quick")
+    for i in range(size):
+        recorder.time("join", queue.join, "Student {}".format(i), CLASS_START + i * 180 // size)
+    read(recorder, queue, CLASS_START + 180)
+    return queue
+
+
+def churn(recorder, size, operations, seed):
+    """
+    Keep a queue of about the given size while tutors accept and students cancel or join.
+    :param recorder: The recorder of the latencies
+    :param size (int): The number of students waiting at any time
+    :param operations (int): The number of accepts, cancels and joins
+    :param seed (int): The seed of the random choices
+    :return (QuestionQueue): The question queue
+    """
+    rng = random.Random(seed)
+    queue = QuestionQueue("quick")
+    students = ["Student {}".format(i) for i in range(size * 2)]
+    waiting = []  # The names in the queue, kept in a list for constant time random choices
+    idle = list(students)
+    now = CLASS_START
+    for _ in range(size):
+        name = idle.pop(rng.randrange(len(idle)))
+        queue.join(name, now)
+        waiting.append(name)
+    for _ in range(operations):
+        now += rng.randint(0, 10)
+        choice = rng.random()
+        if choice < 0.4 and waiting:
+            name = queue.waiting.peek().name
+            recorder.time("confirm", queue.confirm, name)
+            waiting.remove(name)
+            idle.append(name)
+        elif choice < 0.5 and waiting:
+            index = rng.randrange(len(waiting))
+            name = waiting[index]
+            waiting[index] = waiting[-1]
+            waiting.pop()
+            recorder.time("cancel", queue.cancel, name)
+            idle.append(name)
+        elif idle:
+            index = rng.randrange(len(idle))
+            name = idle[index]
+            idle[index] = idle[-1]
+            idle.pop()
+            recorder.time("join", queue.join, name, now)
+            waiting.append(name)
+    read(recorder, queue, now)
+    return queue
+
+
+def history(recorder, confirmations, seed, students=500, joins=2000):
+    """
+    Join and cancel students after a semester of accepted requests.
+    :param recorder: The recorder of the latencies
+    :param confirmations (int): The number of accepted requests in the history
+    :param seed (int): The seed of the random choices
+    :param students (int): The number of students in the course
+    :param joins (int): The number of timed joins
+    :return (QuestionQueue): The question queue
+    """
+    rng = random.Random(seed)
+    queue = QuestionQueue("quick")
+    names = ["Student {}".format(i) for i in range(students)]
+    for i in range(confirmations):
+        queue.join(rng.choice(names), CLASS_START + i)
+        queue.confirm(queue.waiting.peek().name)
+    now = CLASS_START + confirmations
+    for i in range(joins):
+        name = names[i % students]
+        recorder.time("join", queue.join, name, now + i)
+        if i % 2:
+            recorder.time("cancel", queue.cancel, name)
+        else:
+            recorder.time("confirm", queue.confirm, name)
+    return queue
+
+
+# ------ GUI Redraw ------ #
+
+
+def start_xvfb(display=":99"):
+    """
+    Start a virtual X server and point the GUI at it.
+    :param display (str): The display number of the server
+    :return (Popen): The server process
+    """
+    process = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x800x24"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    time.sleep(1)
+    return process
+
+
+def load_gui():
+    """
+    Import queue.py without starting its main loop.
+    It is loaded by path as its module name would otherwise resolve to the standard library,
+    and saves its queues to a temporary log rather than the one of the application.
+    :return (module): The GUI module
+    """
+    os.environ["CLASS_QUEUE_LOG"] = os.path.join(tempfile.mkdtemp(), "class_queue.log")
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "queue.py")
+    spec = importlib.util.spec_from_file_location("queue_gui", path)
+    gui = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gui)
+    return gui
+
+
+def redraw(sizes, repeat=20):
+    """
+    Time the approximate redraw of the quick queue at each queue size, with and without a change to display.
+    Each timed call is one tick of the refresh scheduler, as in the main loop, redrawing the queue once
+    and letting Tk process the resulting geometry and display changes.
+    :param sizes (list): The queue sizes
+    :param repeat (int): The number of timed redraws of each kind
+    """
+    gui = load_gui()
+    section = gui.sections["quick"]
+    queue = section.queue
+    gui.root.update_idletasks()
+    for size in sizes:
+        recorder = Recorder()
+        for name in list(queue.waiting.entries):
+            queue.cancel(name)
+        now = round(time.time())
+        for i in range(size):
+            queue.join("Student {}".format(i), now - i)
+        recorder.time("first redraw", gui.root.update_idletasks)
+        for _ in range(repeat):
+            recipient = queue.cancel(queue.waiting.peek().name)
+            recorder.time("changed redraw", gui.root.update_idletasks)
+            queue.join(recipient.name, recipient.start_time)
+            recorder.time("changed redraw", gui.root.update_idletasks)
+            gui.scheduler.mark_dirty(section.refresh)
+            recorder.time("unchanged redraw", gui.root.update_idletasks)
+        recorder.report("Approximate redraw of the quick queue with {} students".format(size))
+    gui.root.destroy()
+
+
+# ------ Command Line ------ #
+
+
+def main():
+    """
+    Run the benchmarks selected on the command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="queue sizes of the burst, churn and redraw benchmarks")
+    parser.add_argument("--history", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="numbers of accepted requests preloaded in the history benchmark")
+    parser.add_argument("--operations", type=int, default=10000,
+                        help="number of accepts, cancels and joins in the churn benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tk", action="store_true", help="also time the GUI redraw of the quick queue")
+    parser.add_argument("--xvfb", action="store_true", help="run the GUI redraw under a virtual X server")
+    arguments = parser.parse_args()
+    for size in arguments.sizes:
+        run("Burst of {} joins".format(size), burst, size)
+    for size in arguments.sizes:
+        run("Churn of {} operations around {} students".format(arguments.operations, size),
+            churn, size, arguments.operations, arguments.seed)
+    for confirmations in arguments.history:
+        run("Joins after {} accepted requests".format(confirmations), history, confirmations, arguments.seed)
+    if arguments.tk:
+        process = start_xvfb() if arguments.xvfb else None
+        try:
+            redraw(arguments.sizes)
+        finally:
+            if process is not None:
+                process.terminate()
+
+
+if __name__ == "__main__":
+    main()
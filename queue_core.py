@@ -0,0 +1,708 @@
+"""
+Programming Class Queue - Core
+
+The queue logic shared by the GUI and any headless use of the queue.
+This module does not depend on tkinter.
+"""
+
+__author__ = "Steven Yulong Yan"
+
+
+# ------ Imported Modules ------ #
+
+
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+
+# ------ Global Variables ------ #
+
+
+NO_STUDENTS = "No students in queue."
+NAME_LIMIT = 17  # The most characters in the name of a recipient
+
+
+# ------ Name Verification ------ #
+
+
+def name_problem(name):
+    """
+    Verify the name of a recipient, which may only hold letters, spaces and apostrophes.
+    :param name (str): The input name
+    :return (str): Why the name fails verification, one of "too long", "unaccepted characters" and "invalid",
+                   or None if it passes
+    """
+    if len(name) > NAME_LIMIT:
+        return "too long"
+    if (all(char.isalpha() or char == " " or char == "'" for char in name) and
+            not all(char.isspace() for char in name)):
+        return None
+    if not all(char.isspace() for char in name):
+        return "unaccepted characters"
+    return "invalid"
+
+
+# ------ Time Display ------ #
+
+
+def time_convert(time_digit):
+    """
+    Convert the time into a desired format.
+    :param time_digit: (int) The original time expression
+    :return (str): The converted time expression
+    """
+    if time_digit < 60:
+        time_string = "a few seconds"
+    elif 60 <= time_digit < 120:
+        time_string = "a minute"
+    elif 120 <= time_digit < 3600:
+        minutes = time_digit // 60
+        time_string = "{} minutes".format(minutes)
+    elif 3600 <= time_digit < 7200:
+        time_string = "1 hour"
+    else:
+        hours = time_digit // 3600
+        time_string = "{} hours".format(hours)
+    return time_string
+
+
+def time_boundary(time_digit):
+    """
+    Return the smallest time expression after the given one which converts into a different format.
+    :param time_digit: (int) The original time expression
+    :return (int): The time expression at which the converted time expression next changes
+    """
+    if time_digit < 60:
+        return 60
+    elif time_digit < 3600:
+        return (time_digit // 60 + 1) * 60
+    elif time_digit < 7200:
+        return 7200
+    else:
+        return (time_digit // 3600 + 1) * 3600
+
+
+# ------ Exceptions ------ #
+
+
+class QueueError(Exception):
+    """
+    A request rejected by a question queue
+    """
+
+    def __init__(self, queue):
+        """
+        Construct a rejection.
+        :param queue: The question queue responsible for the rejection
+        """
+        super().__init__(queue.name)
+        self.queue = queue
+
+
+class AlreadyQueuedError(QueueError):
+    """
+    The recipient is already waiting in the queue
+    """
+
+
+class InAnotherQueueError(QueueError):
+    """
+    The recipient is already waiting in another queue
+    """
+
+
+# ------ The Queue Class ------ #
+
+
+Recipient = namedtuple("Recipient", ["name", "questions", "start_time"])
+
+
+class Change(namedtuple("Change", ["action", "queue", "position", "recipient", "count", "waiting", "start_time_sum",
+                                   "pending"])):
+    """
+    A change to a question queue, carrying enough to mirror the queue without looking at the rest of it:
+    the action ("join", "cancel" or "confirm"), the queue name, the position the recipient was inserted at
+    or removed from, the recipient, their number of accepted requests after the change,
+    the number of recipients waiting and the sum of their start times after the change,
+    and the number of changes of the same batch still to come, 0 for the last or only change.
+    Recipients never move within a queue as their keys are fixed while waiting,
+    so every change is an insertion or a removal.
+    """
+
+    __slots__ = ()
+
+    def message(self):
+        """
+        Return the change as a JSON serializable event.
+        :return (dict): The event
+        """
+        return {"event": self.action, "queue": self.queue, "position": self.position,
+                "recipient": list(self.recipient), "count": self.count, "waiting": self.waiting,
+                "start_time_sum": self.start_time_sum, "pending": self.pending}
+
+    @classmethod
+    def from_message(cls, message):
+        """
+        Construct a change from an event returned by message.
+        :param message (dict): The event
+        :return (Change): The change
+        """
+        return cls(message["event"], message["queue"], message["position"], Recipient(*message["recipient"]),
+                   message["count"], message["waiting"], message["start_time_sum"], message.get("pending", 0))
+
+
+class Queue:
+    """
+    A queue of recipients ordered firstly by questions answered and secondly by the time of entry
+    """
+
+    def __init__(self, starting_queue=None):
+        """
+        Construct a queue.
+        :param starting_queue: The starting (name, questions, start_time) entries
+        """
+        # The sorted (questions, start_time, sequence, name) keys. Positions are found by bisection in O(log n),
+        # but inserting or deleting a key still shifts the keys after it in O(n). That shift is a single memmove,
+        # which stays cheaper than a balanced tree for the hundreds of students of a class.
+        self.order = []
+        self.entries = {}  # The keys indexed by the recipient name
+        self.sequence = 0  # Breaks ties so that recipients are kept in the order they were added
+        self.start_time_sum = 0  # The sum of the start times, kept for the average wait time
+        if starting_queue is not None:
+            for name, questions, start_time in starting_queue:
+                self.add(name, questions, start_time)
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def add(self, name, questions, start_time):
+        """
+        Insert a recipient at its place in the queue.
+        :param name (str): The name of the recipient
+        :param questions (int): The number of questions answered of the recipient
+        :param start_time (int): The time when the recipient enters the queue
+        :return (int): The position of the recipient in the queue
+        """
+        key = (questions, start_time, self.sequence, name)
+        self.sequence += 1
+        position = bisect_left(self.order, key)
+        self.order.insert(position, key)
+        self.entries[name] = key
+        self.start_time_sum += start_time
+        return position
+
+    def add_many(self, entries):
+        """
+        Insert several recipients with a single ordering update.
+        :param entries: The (name, questions, start_time) entries
+        :return (list): The (position, Recipient) pairs of the inserted entries in order of position,
+                        each position being where the entry is inserted once the ones before it are
+        """
+        keys = []
+        for name, questions, start_time in entries:
+            key = (questions, start_time, self.sequence, name)
+            self.sequence += 1
+            keys.append(key)
+            self.entries[name] = key
+            self.start_time_sum += start_time
+        keys.sort()
+        # The queue and the new keys are two sorted runs, which the sort merges in linear time.
+        self.order.extend(keys)
+        self.order.sort()
+        return [(bisect_left(self.order, key), Recipient(key[3], key[0], key[1])) for key in keys]
+
+    def index(self, name):
+        """
+        Return the position of a recipient in the queue.
+        :param name (str): The name of the recipient
+        :return (int): The position or None if not queued
+        """
+        key = self.entries.get(name)
+        if key is None:
+            return None
+        return bisect_left(self.order, key)
+
+    def remove(self, name):
+        """
+        Remove a recipient from the queue.
+        :param name (str): The name of the recipient
+        :return (Recipient): The removed entry or None if not queued
+        """
+        key = self.entries.pop(name, None)
+        if key is None:
+            return None
+        del self.order[bisect_left(self.order, key)]
+        self.start_time_sum -= key[1]
+        return Recipient(key[3], key[0], key[1])
+
+    def remove_many(self, names):
+        """
+        Remove several recipients with a single ordering update.
+        :param names: The names of the recipients, those not queued are skipped
+        :return (list): The (position, Recipient) pairs of the removed entries in order of position,
+                        each position being where the entry is removed from once the ones before it are
+        """
+        keys = []
+        for name in names:
+            key = self.entries.pop(name, None)
+            if key is not None:
+                keys.append(key)
+                self.start_time_sum -= key[1]
+        keys.sort()
+        positions = [bisect_left(self.order, key) - offset for offset, key in enumerate(keys)]
+        removed = set(keys)
+        self.order = [key for key in self.order if key not in removed]
+        return [(position, Recipient(key[3], key[0], key[1])) for position, key in zip(positions, keys)]
+
+    def peek(self):
+        """
+        Return the recipient at the top of the queue.
+        :return (Recipient): The entry or None if the queue is empty
+        """
+        if not self.order:
+            return None
+        key = self.order[0]
+        return Recipient(key[3], key[0], key[1])
+
+    def total_wait(self, now):
+        """
+        Return the sum of the wait times of every recipient in the queue.
+        :param now (int): The current time
+        :return (int): The total wait time
+        """
+        return len(self.order) * now - self.start_time_sum
+
+    def window(self, first=0, last=None):
+        """
+        Return a slice of the queue list in order.
+        :param first (int): The position of the first entry
+        :param last (int): The position after the last entry, the end of the queue by default
+        :return (list): The Recipient entries
+        """
+        return [Recipient(key[3], key[0], key[1]) for key in self.order[first:last]]
+
+    def get_queue(self):
+        """
+        Return the queue list in order.
+        :return (list): The Recipient entries
+        """
+        return [Recipient(key[3], key[0], key[1]) for key in self.order]
+
+
+class History:
+    """
+    A log of the recipients whose requests have been accepted, kept in columns so years of it stay in memory
+    """
+
+    def __init__(self, starting_history=None):
+        """
+        Construct a history log.
+        :param starting_history: The starting (name, questions, start_time) entries
+        """
+        self.names = []  # The distinct recipient names indexed by their ids
+        self.name_ids = {}  # The ids indexed by the recipient name
+        self.counts = array("I")  # The number of accepted requests indexed by the name id
+        # One row per accepted request: the name id, the questions answered and the integer start time.
+        self.name_column = array("I")
+        self.questions_column = array("I")
+        self.start_time_column = array("q")
+        if starting_history is not None:
+            for entry in starting_history:
+                self.append(entry)
+
+    def __len__(self):
+        return len(self.name_column)
+
+    def name_id(self, name):
+        """
+        Return the id of a recipient name, giving it one if it is new to the history.
+        Each distinct name is then stored once however many of its requests are accepted.
+        :param name (str): The name of the recipient
+        :return (int): The id of the name
+        """
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self.name_ids[name] = name_id
+            self.counts.append(0)
+        return name_id
+
+    def append(self, entry):
+        """
+        Record an accepted request.
+        :param entry (tuple): The (name, questions, start_time) entry
+        """
+        name, questions, start_time = entry
+        name_id = self.name_id(name)
+        self.name_column.append(name_id)
+        self.questions_column.append(questions)
+        self.start_time_column.append(start_time)
+        self.counts[name_id] += 1
+
+    def carry(self, counts):
+        """
+        Carry over the accepted requests counted elsewhere, such as in earlier sessions of a course,
+        keeping the larger of the two counts of every recipient.
+        :param counts (dict): The numbers of accepted requests indexed by the recipient name
+        """
+        for name, count in counts.items():
+            name_id = self.name_id(name)
+            self.counts[name_id] = max(self.counts[name_id], count)
+
+    def count(self, name):
+        """
+        Return the number of accepted requests of a recipient.
+        :param name (str): The name of the recipient
+        :return (int): The number of questions answered of the recipient
+        """
+        name_id = self.name_ids.get(name)
+        return 0 if name_id is None else self.counts[name_id]
+
+    def get_queue(self, first=0):
+        """
+        Return the history list, or the part of it from a given entry.
+        :param first (int): The index of the first entry returned
+        :return (list): The Recipient entries, oldest first
+        """
+        names = self.names
+        return [Recipient(names[name_id], questions, start_time) for name_id, questions, start_time
+                in zip(self.name_column[first:], self.questions_column[first:], self.start_time_column[first:])]
+
+
+# ------ Question Queues ------ #
+
+
+class QuestionQueue:
+    """
+    A question queue with its waiting recipients and the history of accepted requests
+    """
+
+    def __init__(self, name):
+        """
+        Construct a question queue.
+        :param name (str): The name of the question queue
+        """
+        self.name = name
+        self.waiting = Queue()
+        self.history = History()
+        self.registry = None  # The registry of the question queues a recipient can only wait in one of
+        self.listeners = []  # The functions called with the Change after every change
+
+    def notify(self, action, recipient, position):
+        """
+        Tell every listener about a change to the queue.
+        :param action (str): One of "join", "cancel" and "confirm"
+        :param recipient (Recipient): The entry affected by the change
+        :param position (int): The position the recipient was inserted at or removed from
+        """
+        if self.registry is not None:
+            self.registry.move(action, recipient.name, self)
+        if not self.listeners:
+            return
+        change = Change(action, self.name, position, recipient, self.history.count(recipient.name),
+                        len(self.waiting), self.waiting.start_time_sum, 0)
+        for listener in self.listeners:
+            listener(change)
+
+    def notify_many(self, action, placed, waiting, start_time_sum):
+        """
+        Tell every listener about a batch of changes to the queue, one change per recipient,
+        as if they had been made one after the other.
+        :param action (str): One of "join", "cancel" and "confirm"
+        :param placed (list): The (position, Recipient) pairs of the batch in the order they are applied
+        :param waiting (int): The number of recipients waiting before the batch
+        :param start_time_sum (int): The sum of the start times before the batch
+        """
+        if self.registry is not None:
+            for position, recipient in placed:
+                self.registry.move(action, recipient.name, self)
+        if not self.listeners:
+            return
+        step = 1 if action == "join" else -1
+        for index, (position, recipient) in enumerate(placed):
+            waiting += step
+            start_time_sum += step * recipient.start_time
+            change = Change(action, self.name, position, recipient, self.history.count(recipient.name),
+                            waiting, start_time_sum, len(placed) - index - 1)
+            for listener in self.listeners:
+                listener(change)
+
+    def locate(self, name):
+        """
+        Return the question queue a recipient is waiting in, among the queues of the registry if there is one.
+        :param name (str): The name of the recipient
+        :return (QuestionQueue): The question queue or None if the recipient is not waiting
+        """
+        if self.registry is not None:
+            return self.registry.locate(name)
+        return self if name in self.waiting else None
+
+    def restore(self, waiting, history):
+        """
+        Replace the recipients and history of the queue without telling the listeners.
+        :param waiting: The (name, questions, start_time) entries waiting in the queue
+        :param history: The (name, questions, start_time) entries of the accepted requests
+        """
+        self.waiting = Queue(waiting)
+        self.history = History(history)
+        if self.registry is not None:
+            self.registry.reindex(self)
+
+    def join(self, name, start_time=None):
+        """
+        Add a recipient to the queue with the number of their accepted requests as questions answered.
+        :param name (str): The verified name of the recipient
+        :param start_time (int): The time when the recipient enters the queue, now by default
+        :return (Recipient): The added entry
+        :raise AlreadyQueuedError: If the recipient is already waiting in the queue
+        :raise InAnotherQueueError: If the recipient is already waiting in another queue
+        """
+        other = self.locate(name)
+        if other is self:
+            raise AlreadyQueuedError(self)
+        if other is not None:
+            raise InAnotherQueueError(other)
+        if start_time is None:
+            start_time = round(time.time())
+        recipient = Recipient(name, self.history.count(name), start_time)
+        position = self.waiting.add(*recipient)
+        self.notify("join", recipient, position)
+        return recipient
+
+    def cancel(self, name):
+        """
+        Remove a recipient from the queue.
+        :param name (str): The name of the recipient
+        :return (Recipient): The removed entry or None if not queued
+        """
+        position = self.waiting.index(name)
+        recipient = self.waiting.remove(name)
+        if recipient is not None:
+            self.notify("cancel", recipient, position)
+        return recipient
+
+    def confirm(self, name):
+        """
+        Remove a recipient from the queue and store it in the history.
+        :param name (str): The name of the recipient
+        :return (Recipient): The accepted entry or None if not queued
+        """
+        position = self.waiting.index(name)
+        recipient = self.waiting.remove(name)
+        if recipient is not None:
+            self.history.append(recipient)
+            self.notify("confirm", recipient, position)
+        return recipient
+
+    def join_many(self, names, start_time=None):
+        """
+        Add several recipients to the queue as one transaction: either all of them join or none does.
+        :param names: The verified names of the recipients
+        :param start_time (int): The time when the recipients enter the queue, now by default
+        :return (list): The added entries in order of position
+        :raise AlreadyQueuedError: If a recipient is already waiting in the queue or is named twice
+        :raise InAnotherQueueError: If a recipient is already waiting in another queue
+        """
+        names = list(names)
+        if len(set(names)) != len(names):
+            raise AlreadyQueuedError(self)
+        for name in names:
+            other = self.locate(name)
+            if other is self:
+                raise AlreadyQueuedError(self)
+            if other is not None:
+                raise InAnotherQueueError(other)
+        if start_time is None:
+            start_time = round(time.time())
+        waiting, start_time_sum = len(self.waiting), self.waiting.start_time_sum
+        placed = self.waiting.add_many((name, self.history.count(name), start_time) for name in names)
+        self.notify_many("join", placed, waiting, start_time_sum)
+        return [recipient for position, recipient in placed]
+
+    def cancel_many(self, names):
+        """
+        Remove several recipients from the queue as one transaction.
+        :param names: The names of the recipients, those not queued are skipped
+        :return (list): The removed entries in order of position
+        """
+        return self.leave("cancel", names)
+
+    def confirm_many(self, names):
+        """
+        Remove several recipients from the queue and store them in the history as one transaction.
+        :param names: The names of the recipients, those not queued are skipped
+        :return (list): The accepted entries in order of position
+        """
+        return self.leave("confirm", names)
+
+    def clear(self):
+        """
+        Remove every recipient from the queue as one transaction.
+        :return (list): The removed entries in order of position
+        """
+        return self.leave("cancel", list(self.waiting.entries))
+
+    def leave(self, action, names):
+        """
+        Remove several recipients from the queue with a single ordering update, then tell the listeners.
+        :param action (str): Either "cancel" or "confirm", which also stores the recipients in the history
+        :param names: The names of the recipients, those not queued are skipped
+        :return (list): The removed entries in order of position
+        """
+        waiting, start_time_sum = len(self.waiting), self.waiting.start_time_sum
+        placed = self.waiting.remove_many(names)
+        if action == "confirm":
+            for position, recipient in placed:
+                self.history.append(recipient)
+        self.notify_many(action, placed, waiting, start_time_sum)
+        return [recipient for position, recipient in placed]
+
+    def accurate_display(self, now, first=0, last=None):
+        """
+        Return the accurate display of the queue, or of the given slice of it.
+        :param now (int): The current time
+        :param first (int): The position of the first displayed entry
+        :param last (int): The position after the last displayed entry, the end of the queue by default
+        :return (tuple): The (name, questions, time string) entries in order and the average wait time text
+        """
+        entries = []
+        for recipient in self.waiting.window(first, last):
+            elapsed_time = now - recipient.start_time
+            if elapsed_time == 0:
+                entries.append((recipient.name, recipient.questions, "{} second ago".format(elapsed_time)))
+            else:
+                entries.append((recipient.name, recipient.questions, "{} seconds ago".format(elapsed_time)))
+        average_text = NO_STUDENTS
+        recipient_number = len(self.waiting)
+        if recipient_number:
+            average_wait_time = self.waiting.total_wait(now) // recipient_number
+            if recipient_number == 1:
+                if average_wait_time == 0:
+                    average_text = ("An average wait time of {} second for 1 student."
+                                    .format(average_wait_time))
+                else:
+                    average_text = ("An average wait time of {} seconds for 1 student."
+                                    .format(average_wait_time))
+            else:
+                average_text = ("An average wait time of about {} seconds "
+                                "for {} students"
+                                .format(average_wait_time, recipient_number))
+        return entries, average_text
+
+    def approximate_display(self, now, first=0, last=None):
+        """
+        Return the approximate display of the queue, or of the given slice of it, and when it is next due to change.
+        :param now (int): The current time
+        :param first (int): The position of the first displayed entry
+        :param last (int): The position after the last displayed entry, the end of the queue by default
+        :return (tuple): The (name, questions, time string) entries in order, the average wait time text
+                         and the time at which the display next changes or None if the queue is empty
+        """
+        next_change = None
+        entries = []
+        for recipient in self.waiting.window(first, last):
+            elapsed_time = now - recipient.start_time
+            entries.append((recipient.name, recipient.questions, "{} ago".format(time_convert(elapsed_time))))
+            change_time = recipient.start_time + time_boundary(elapsed_time)
+            if next_change is None or change_time < next_change:
+                next_change = change_time
+        average_text = NO_STUDENTS
+        recipient_number = len(self.waiting)
+        if recipient_number:
+            sum_time = self.waiting.total_wait(now)
+            average_wait_time = sum_time // recipient_number
+            # The average reaches the next boundary once the summed wait time does so for every student.
+            change_time = now - (sum_time - time_boundary(average_wait_time) * recipient_number) // recipient_number
+            next_change = change_time if next_change is None else min(next_change, change_time)
+            if recipient_number == 1:
+                average_text = ("An average wait time of {} for 1 student."
+                                .format(time_convert(average_wait_time)))
+            else:
+                average_text = ("An average wait time of about {} "
+                                "for {} students"
+                                .format(time_convert(average_wait_time), recipient_number))
+        return entries, average_text, next_change
+
+
+# ------ Queue Registry ------ #
+
+
+class QueueRegistry:
+    """
+    The question queues of a class, any number of them, with a single index of where every recipient waits
+    so that a recipient waits in at most one of them
+    """
+
+    def __init__(self, queues=()):
+        """
+        Construct a registry of question queues.
+        :param queues: The question queues, in display order
+        """
+        self.queues = {}  # The question queues indexed by their names, in display order
+        self.placements = {}  # The question queue of every waiting recipient indexed by the recipient name
+        for queue in queues:
+            self.add(queue)
+
+    def __iter__(self):
+        return iter(self.queues.values())
+
+    def __len__(self):
+        return len(self.queues)
+
+    def __getitem__(self, name):
+        return self.queues[name]
+
+    def get(self, name):
+        """
+        Return a question queue by its name.
+        :param name (str): The name of the question queue
+        :return (QuestionQueue): The question queue or None if there is no such queue
+        """
+        return self.queues.get(name)
+
+    def add(self, queue):
+        """
+        Register a question queue along with the recipients already waiting in it.
+        :param queue (QuestionQueue): The question queue
+        :return (QuestionQueue): The question queue
+        """
+        self.queues[queue.name] = queue
+        queue.registry = self
+        self.reindex(queue)
+        return queue
+
+    def locate(self, name):
+        """
+        Return the question queue a recipient is waiting in.
+        :param name (str): The name of the recipient
+        :return (QuestionQueue): The question queue or None if the recipient is not waiting
+        """
+        return self.placements.get(name)
+
+    def move(self, action, name, queue):
+        """
+        Follow a change to one of the question queues.
+        :param action (str): One of "join", "cancel" and "confirm"
+        :param name (str): The name of the recipient
+        :param queue (QuestionQueue): The question queue which has changed
+        """
+        if action == "join":
+            self.placements[name] = queue
+        elif self.placements.get(name) is queue:
+            del self.placements[name]
+
+    def reindex(self, queue):
+        """
+        Rebuild the placements of a question queue after its recipients were replaced.
+        :param queue (QuestionQueue): The question queue
+        """
+        for name in [name for name, other in self.placements.items() if other is queue]:
+            del self.placements[name]
+        for name in queue.waiting.entries:
+            self.placements[name] = queue
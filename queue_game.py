@@ -0,0 +1,623 @@
+"""
+Programming Class Queue - Game Physics
+
+The state and physics of the Paddle Ball games, kept in plain objects so the games can be stepped
+without a display. The GUI only draws the state once per frame.
+Moves are swept: every boundary, platform, paddle and target met during a step is found at its time of impact,
+so a step may be as long as a frame without the ball passing through anything.
+Run it to play seeded rounds headlessly, steered by an autopilot or a script of key presses,
+and report the steps per second and the collisions, e.g. python3 queue_game.py --game single --rounds 100.
+This module does not depend on tkinter.
+"""
+
+__author__ = "Steven Yulong Yan"
+
+
+# ------ Imported Modules ------ #
+
+
+import argparse
+import math
+import random
+import time
+
+
+# ------ Global Variables ------ #
+
+
+BOARD_WIDTH = 1140
+BOARD_HEIGHT = 690
+TARGET_DIAMETER = 20
+TICK = 0.01  # The number of seconds the speeds of the games are given for
+SWEEP_LIMIT = 8  # The most impacts resolved within one step
+STEP_LIMIT = 20000  # The most steps a simulated round is played for, as the autopilot may never lose
+
+
+# ------ Shapes ------ #
+
+
+class Vector:
+    """
+    A position or velocity on the board
+    """
+
+    def __init__(self, x, y):
+        """
+        Construct a vector.
+        :param x (float): The horizontal component
+        :param y (float): The vertical component
+        """
+        self.x = x
+        self.y = y
+
+
+class Box:
+    """
+    An axis-aligned box moving on the board
+    """
+
+    def __init__(self, x, y, width, height):
+        """
+        Construct a box at rest.
+        :param x (float): The position of the left edge
+        :param y (float): The position of the top edge
+        :param width (float): The width of the box
+        :param height (float): The height of the box
+        """
+        self.position = Vector(x, y)
+        self.velocity = Vector(0, 0)
+        self.width = width
+        self.height = height
+
+    @property
+    def left(self):
+        return self.position.x
+
+    @property
+    def top(self):
+        return self.position.y
+
+    @property
+    def right(self):
+        return self.position.x + self.width
+
+    @property
+    def bottom(self):
+        return self.position.y + self.height
+
+    def bounds(self):
+        """
+        Return the edges of the box in the order of Canvas coordinates.
+        :return (tuple): The left, top, right and bottom edges
+        """
+        return self.left, self.top, self.right, self.bottom
+
+    def move(self, duration=1):
+        """
+        Move the box by its velocity.
+        :param duration (float): The number of ticks to move for
+        """
+        self.position.x += self.velocity.x * duration
+        self.position.y += self.velocity.y * duration
+
+    def sweep(self, impacts, duration=1):
+        """
+        Move the box by its velocity, stopping at every impact on the way to apply it before moving on.
+        :param impacts: The function taking a move (dx, dy) of the box over a number of ticks and returning
+                        the (fraction, action) pairs of the impacts during the move, with the fraction of the move
+                        at which each happens and the function applying it
+        :param duration (float): The number of ticks to move for
+        """
+        for _ in range(SWEEP_LIMIT):
+            dx = self.velocity.x * duration
+            dy = self.velocity.y * duration
+            found = impacts(dx, dy, duration)
+            if not found:
+                break
+            fraction, action = min(found, key=lambda impact: impact[0])
+            self.position.x += dx * fraction
+            self.position.y += dy * fraction
+            duration -= duration * fraction
+            action()
+        self.move(duration)
+
+
+def time_of_impact(edge, distance, line):
+    """
+    Return the fraction of a move at which an edge moving by the given distance reaches a line.
+    An edge already on the line is leaving it, which is not an impact.
+    :param edge (float): The position of the edge
+    :param distance (float): The distance moved by the edge
+    :param line (float): The position of the line
+    :return (float): The fraction of the move or None if the line is not reached
+    """
+    if distance == 0:
+        return None
+    fraction = (line - edge) / distance
+    if 0 < fraction <= 1:
+        return fraction
+    return None
+
+
+class Circle:
+    """
+    A circle fixed on the board
+    """
+
+    def __init__(self, x, y, radius):
+        """
+        Construct a circle.
+        :param x (float): The horizontal position of the centre
+        :param y (float): The vertical position of the centre
+        :param radius (float): The radius of the circle
+        """
+        self.centre = Vector(x, y)
+        self.radius = radius
+
+    def contains(self, box):
+        """
+        Return True if the circle drawn within a box lies inside this circle and False otherwise.
+        :param box (Box): The box
+        :return (bool): True if the circle of the box is inside and False otherwise
+        """
+        distance = math.hypot(box.left + box.width / 2 - self.centre.x, box.top + box.height / 2 - self.centre.y)
+        return distance + min(box.width, box.height) / 2 <= self.radius
+
+    def time_of_impact(self, box, dx, dy):
+        """
+        Return the fraction of a move at which the circle drawn within a box enters this circle.
+        :param box (Box): The moving box
+        :param dx (float): The horizontal distance moved
+        :param dy (float): The vertical distance moved
+        :return (float): The fraction of the move or None if the circle is not entered
+        """
+        reach = self.radius - min(box.width, box.height) / 2
+        offset_x = box.left + box.width / 2 - self.centre.x
+        offset_y = box.top + box.height / 2 - self.centre.y
+        # Solve |offset + fraction * move| = reach for the first fraction
+        a = dx * dx + dy * dy
+        b = 2 * (offset_x * dx + offset_y * dy)
+        c = offset_x * offset_x + offset_y * offset_y - reach * reach
+        discriminant = b * b - 4 * a * c
+        if a == 0 or discriminant < 0:
+            return None
+        fraction = (-b - math.sqrt(discriminant)) / (2 * a)
+        if 0 < fraction <= 1:
+            return fraction
+        return None
+
+
+# ------ Single Player ------ #
+
+
+class SingleGame:
+    """
+    The state of Paddle Ball with a single player: a sphere, the platform catching it and two targets
+    """
+
+    def __init__(self, rng=random):
+        """
+        Construct a game with the sphere in the centre moving upwards.
+        :param rng: The source of the random direction of the sphere
+        """
+        self.sphere = Box(565, 300, 25, 25)
+        self.sphere.velocity = Vector(rng.choice([-4, -3, -2, -1, 1, 2, 3, 4]), -4)
+        self.platform = Box(510, 600, 150, 10)
+        # The outer rings of the targets are drawn three target diameters wide
+        self.target_left = Circle(285 + TARGET_DIAMETER / 2, 100 + TARGET_DIAMETER / 2, TARGET_DIAMETER * 1.5)
+        self.target_right = Circle(855 + TARGET_DIAMETER / 2, 100 + TARGET_DIAMETER / 2, TARGET_DIAMETER * 1.5)
+        self.left_hit = False
+        self.right_hit = False
+        self.bottom_hit = False
+        self.collisions = {}  # The number of collisions indexed by what the sphere collided with
+
+    def step(self, duration=1):
+        """
+        Move the sphere and the platform by one time step,
+        reversing the sphere when it hits the boundaries or the platform.
+        :param duration (float): The number of ticks in the step
+        :return (bool): True if the game goes on and False if it is won or lost
+        """
+        sphere = self.sphere
+        sphere.sweep(self.impacts, duration)
+        # The sphere hits the top edge of the board.
+        if sphere.top <= 0 and sphere.velocity.y < 0:
+            self.bounce_down()
+        # The sphere hits the bottom edge of the board.
+        if sphere.bottom >= BOARD_HEIGHT and not self.bottom_hit:
+            self.fall()
+        # The sphere hits the left boundary of the board.
+        if sphere.left <= 0 and sphere.velocity.x < 0:
+            self.bounce_right()
+        # The sphere hits the right boundary of the board.
+        if sphere.right >= BOARD_WIDTH and sphere.velocity.x > 0:
+            self.bounce_left()
+        # The sphere collides with the surface of the platform.
+        if self.caught() and sphere.velocity.y > 0:
+            self.bounce_up()
+        if not self.left_hit and self.target_left.contains(sphere):
+            self.hit_left()
+        if not self.right_hit and self.target_right.contains(sphere):
+            self.hit_right()
+        platform = self.platform
+        platform.move(duration)
+        # The platform pauses when it reaches the left or right boundary.
+        if platform.left <= 0 or platform.right >= BOARD_WIDTH:
+            platform.position.x = min(max(platform.left, 0), BOARD_WIDTH - platform.width)
+            platform.velocity.x = 0
+        return not self.bottom_hit and not (self.left_hit and self.right_hit)
+
+    def press(self, key):
+        """
+        Steer the platform as the arrow keys do.
+        :param key (str): One of "left", "right" and "pause"
+        """
+        self.platform.velocity.x = {"left": -4, "right": 4, "pause": 0}[key]
+
+    def result(self):
+        """
+        Return the result of the game.
+        :return (str): "won", "lost" or None if the game goes on
+        """
+        if self.bottom_hit:
+            return "lost"
+        if self.left_hit and self.right_hit:
+            return "won"
+        return None
+
+    def impacts(self, dx, dy, duration):
+        """
+        Return the impacts of the sphere during a move.
+        :param dx (float): The horizontal distance moved
+        :param dy (float): The vertical distance moved
+        :param duration (float): The number of ticks of the move
+        :return (list): The (fraction, action) pairs of the impacts
+        """
+        sphere = self.sphere
+        platform = self.platform
+        found = []
+        if dy < 0:
+            found.append((time_of_impact(sphere.top, dy, 0), self.bounce_down))
+        elif dy > 0:
+            found.append((time_of_impact(sphere.bottom, dy, BOARD_HEIGHT), self.fall))
+            fraction = time_of_impact(sphere.bottom, dy, platform.top)
+            # The platform is only met if the sphere is above it at the time of impact, as both move.
+            if fraction is not None:
+                shift = (dx - platform.velocity.x * duration) * fraction
+                if sphere.right + shift >= platform.left and sphere.left + shift <= platform.right:
+                    found.append((fraction, self.bounce_up))
+        if dx < 0:
+            found.append((time_of_impact(sphere.left, dx, 0), self.bounce_right))
+        elif dx > 0:
+            found.append((time_of_impact(sphere.right, dx, BOARD_WIDTH), self.bounce_left))
+        if not self.left_hit:
+            found.append((self.target_left.time_of_impact(sphere, dx, dy), self.hit_left))
+        if not self.right_hit:
+            found.append((self.target_right.time_of_impact(sphere, dx, dy), self.hit_right))
+        return [(fraction, action) for fraction, action in found if fraction is not None]
+
+    def collide(self, obstacle):
+        """
+        Count a collision of the sphere.
+        :param obstacle (str): What the sphere collided with
+        """
+        self.collisions[obstacle] = self.collisions.get(obstacle, 0) + 1
+
+    def bounce_down(self):
+        self.sphere.velocity.y = 4
+        self.collide("wall")
+
+    def bounce_up(self):
+        self.sphere.velocity.y = -4
+        self.collide("platform")
+
+    def bounce_right(self):
+        self.sphere.velocity.x = 4
+        self.collide("wall")
+
+    def bounce_left(self):
+        self.sphere.velocity.x = -4
+        self.collide("wall")
+
+    def fall(self):
+        self.bottom_hit = True
+        self.collide("floor")
+
+    def hit_left(self):
+        self.left_hit = True
+        self.collide("target")
+
+    def hit_right(self):
+        self.right_hit = True
+        self.collide("target")
+
+    def caught(self):
+        """
+        Return True if the sphere is caught by the platform and False otherwise.
+        :return (bool): True if the sphere is caught by the platform and False otherwise
+        """
+        sphere = self.sphere
+        platform = self.platform
+        # The sides of the sphere meet the platform and its bottom hits the surface but is not below the platform.
+        return (sphere.right >= platform.left and sphere.left <= platform.right and
+                platform.top <= sphere.bottom <= platform.bottom)
+
+
+# ------ Double Player ------ #
+
+
+class DoubleGame:
+    """
+    The state of Paddle Ball with two players: a ball bouncing between the left and right paddles
+    """
+
+    def __init__(self, rng=random):
+        """
+        Construct a game with the ball in the centre moving diagonally.
+        :param rng: The source of the random direction of the ball
+        """
+        self.ball = Box(563, 330, 15, 15)
+        self.ball.velocity = Vector(rng.choice([-4, 4]), rng.choice([-4, 4]))
+        self.left_paddle = Box(0, 290, 20, 100)
+        self.right_paddle = Box(1120, 290, 20, 100)
+        self.left_win = False
+        self.right_win = False
+        self.collisions = {}  # The number of collisions indexed by what the ball collided with
+
+    def step(self, duration=1):
+        """
+        Move the ball and the paddles by one time step, reversing the ball when it hits the edges or a paddle.
+        :param duration (float): The number of ticks in the step
+        :return (bool): True if the game goes on and False if either side has won
+        """
+        ball = self.ball
+        ball.sweep(self.impacts, duration)
+        # The ball hits the top edge of the board.
+        if ball.top <= 0 and ball.velocity.y < 0:
+            self.bounce_down()
+        # The ball hits the bottom edge of the board.
+        if ball.bottom >= BOARD_HEIGHT and ball.velocity.y > 0:
+            self.bounce_up()
+        # The ball hits the left boundary of the board.
+        if ball.left <= 0 and not self.right_win:
+            self.pass_left()
+        # The ball hits the right boundary of the board.
+        if ball.right >= BOARD_WIDTH and not self.left_win:
+            self.pass_right()
+        if self.hit_left_paddle() and ball.velocity.x < 0:
+            self.bounce_right()
+        if self.hit_right_paddle() and ball.velocity.x > 0:
+            self.bounce_left()
+        for paddle in (self.left_paddle, self.right_paddle):
+            paddle.move(duration)
+            # Pause the paddle if it reaches the top or bottom end of the screen
+            if paddle.top <= 0 or paddle.bottom >= BOARD_HEIGHT:
+                paddle.position.y = min(max(paddle.top, 0), BOARD_HEIGHT - paddle.height)
+                paddle.velocity.y = 0
+        return not self.left_win and not self.right_win
+
+    def hit_left_paddle(self):
+        """
+        Check if the ball is caught by the left paddle.
+        :return (bool): True if the ball is caught by the left paddle and False otherwise
+        """
+        ball = self.ball
+        paddle = self.left_paddle
+        # The ball meets the paddle vertically and touches its surface.
+        return ball.bottom >= paddle.top and ball.top <= paddle.bottom and ball.left <= paddle.right
+
+    def hit_right_paddle(self):
+        """
+        Check if the ball is caught by the right paddle.
+        :return (bool): True if the ball is caught by the right paddle and False otherwise
+        """
+        ball = self.ball
+        paddle = self.right_paddle
+        # The ball meets the paddle vertically and touches its surface.
+        return ball.bottom >= paddle.top and ball.top <= paddle.bottom and ball.right >= paddle.left
+
+    def press(self, key):
+        """
+        Steer a paddle as the keys of its side do.
+        :param key (str): "red" or "blue" followed by "-up", "-down" or "-pause"
+        """
+        side, direction = key.split("-")
+        paddle = self.left_paddle if side == "red" else self.right_paddle
+        paddle.velocity.y = {"up": -3, "down": 3, "pause": 0}[direction]
+
+    def result(self):
+        """
+        Return the result of the game.
+        :return (str): "red" or "blue" for the winning side or None if the game goes on
+        """
+        if self.left_win:
+            return "red"
+        if self.right_win:
+            return "blue"
+        return None
+
+    def impacts(self, dx, dy, duration):
+        """
+        Return the impacts of the ball during a move.
+        :param dx (float): The horizontal distance moved
+        :param dy (float): The vertical distance moved
+        :param duration (float): The number of ticks of the move
+        :return (list): The (fraction, action) pairs of the impacts
+        """
+        ball = self.ball
+        found = []
+        if dy < 0:
+            found.append((time_of_impact(ball.top, dy, 0), self.bounce_down))
+        elif dy > 0:
+            found.append((time_of_impact(ball.bottom, dy, BOARD_HEIGHT), self.bounce_up))
+        if dx < 0:
+            found.append((time_of_impact(ball.left, dx, 0), self.pass_left))
+            fraction = time_of_impact(ball.left, dx, self.left_paddle.right)
+            if fraction is not None and self.meets(self.left_paddle, dy, duration, fraction):
+                found.append((fraction, self.bounce_right))
+        elif dx > 0:
+            found.append((time_of_impact(ball.right, dx, BOARD_WIDTH), self.pass_right))
+            fraction = time_of_impact(ball.right, dx, self.right_paddle.left)
+            if fraction is not None and self.meets(self.right_paddle, dy, duration, fraction):
+                found.append((fraction, self.bounce_left))
+        return [(fraction, action) for fraction, action in found if fraction is not None]
+
+    def meets(self, paddle, dy, duration, fraction):
+        """
+        Check if the ball overlaps a paddle vertically part way through a move, as both move.
+        :param paddle (Box): The paddle
+        :param dy (float): The vertical distance moved by the ball
+        :param duration (float): The number of ticks of the move
+        :param fraction (float): The fraction of the move
+        :return (bool): True if the ball overlaps the paddle and False otherwise
+        """
+        shift = (dy - paddle.velocity.y * duration) * fraction
+        return self.ball.bottom + shift >= paddle.top and self.ball.top + shift <= paddle.bottom
+
+    def collide(self, obstacle):
+        """
+        Count a collision of the ball.
+        :param obstacle (str): What the ball collided with
+        """
+        self.collisions[obstacle] = self.collisions.get(obstacle, 0) + 1
+
+    def bounce_down(self):
+        self.ball.velocity.y = 4
+        self.collide("wall")
+
+    def bounce_up(self):
+        self.ball.velocity.y = -4
+        self.collide("wall")
+
+    def bounce_right(self):
+        self.ball.velocity.x = 4
+        self.collide("paddle")
+
+    def bounce_left(self):
+        self.ball.velocity.x = -4
+        self.collide("paddle")
+
+    def pass_left(self):
+        self.right_win = True
+        self.collide("goal")
+
+    def pass_right(self):
+        self.left_win = True
+        self.collide("goal")
+
+
+# ------ Headless Simulation ------ #
+
+
+GAMES = {"single": SingleGame, "double": DoubleGame}
+
+
+def read_script(path):
+    """
+    Read a script of key presses, one "<step> <key>" pair per line such as "120 left".
+    Steps are counted from the start of the simulation across every round.
+    :param path (str): The path of the script
+    :return (dict): The lists of keys pressed indexed by the step
+    """
+    script = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip() and not line.startswith("#"):
+                step, key = line.split()
+                script.setdefault(int(step), []).append(key)
+    return script
+
+
+def autopilot(game):
+    """
+    Return the keys steering the platform or the paddles towards the sphere or the ball.
+    :param game: The state of the game
+    :return (list): The keys to press
+    """
+    if isinstance(game, SingleGame):
+        offset = (game.sphere.left + game.sphere.width / 2) - (game.platform.left + game.platform.width / 2)
+        if abs(offset) < game.platform.width / 4:
+            return ["pause"]
+        return ["right" if offset > 0 else "left"]
+    keys = []
+    ball = game.ball
+    for side, paddle, surface in (("red", game.left_paddle, game.left_paddle.right - ball.width / 2),
+                                  ("blue", game.right_paddle, game.right_paddle.left + ball.width / 2)):
+        centre = ball.left + ball.width / 2
+        target = BOARD_HEIGHT / 2
+        if (surface - centre) * ball.velocity.x > 0:
+            # Follow the ball to where it will meet the paddle, folding its path at the top and bottom edges.
+            low = ball.height / 2
+            span = BOARD_HEIGHT - ball.height
+            target = (ball.top + ball.height / 2 + ball.velocity.y * (surface - centre) / ball.velocity.x - low)
+            target %= 2 * span
+            target = low + (2 * span - target if target > span else target)
+        offset = target - (paddle.top + paddle.height / 2)
+        if abs(offset) < paddle.height / 4:
+            keys.append(side + "-pause")
+        else:
+            keys.append(side + ("-down" if offset > 0 else "-up"))
+    return keys
+
+
+def simulate(name, seed, rounds, duration=1, script=None, step_limit=STEP_LIMIT):
+    """
+    Play rounds of a game without a display. The same arguments always play the same rounds.
+    :param name (str): "single" or "double"
+    :param seed (int): The seed of the random directions of the sphere or the ball
+    :param rounds (int): The number of rounds
+    :param duration (float): The number of ticks in a step
+    :param script (dict): The keys pressed indexed by the step, the autopilot steers if None
+    :param step_limit (int): The most steps a round is played for
+    :return (tuple): The number of steps, the numbers of rounds indexed by their results,
+                     the numbers of collisions indexed by the obstacle and the number of seconds taken
+    """
+    rng = random.Random(seed)
+    steps = 0
+    results = {}
+    collisions = {}
+    start = time.perf_counter()
+    for _ in range(rounds):
+        game = GAMES[name](rng)
+        for _ in range(step_limit):
+            keys = autopilot(game) if script is None else script.get(steps, [])
+            for key in keys:
+                game.press(key)
+            steps += 1
+            if not game.step(duration):
+                break
+        result = game.result() or "unfinished"
+        results[result] = results.get(result, 0) + 1
+        for obstacle, count in game.collisions.items():
+            collisions[obstacle] = collisions.get(obstacle, 0) + count
+    return steps, results, collisions, time.perf_counter() - start
+
+
+def main():
+    """
+    Simulate the rounds selected on the command line and print the report.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--game", choices=sorted(GAMES), default="single")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--fps", type=float, default=60,
+                        help="frames per second of the simulated game, one step per frame (60 by default)")
+    parser.add_argument("--script", help="path of the key presses to replay instead of the autopilot")
+    parser.add_argument("--steps", type=int, default=STEP_LIMIT,
+                        help="most steps a round is played for ({} by default)".format(STEP_LIMIT))
+    arguments = parser.parse_args()
+    script = read_script(arguments.script) if arguments.script else None
+    steps, results, collisions, elapsed = simulate(arguments.game, arguments.seed, arguments.rounds,
+                                                   1 / arguments.fps / TICK, script, arguments.steps)
+    print("Paddle Ball {} player, seed {}, {} rounds at {:g} frames per second"
+          .format(arguments.game, arguments.seed, arguments.rounds, arguments.fps))
+    print("    {} steps in {:.2f} seconds, {:.0f} steps per second"
+          .format(steps, elapsed, steps / elapsed if elapsed else 0))
+    print("    results: " + ", ".join("{} {}".format(result, count) for result, count in sorted(results.items())))
+    print("    collisions: " + ", ".join("{} {}".format(obstacle, count)
+                                         for obstacle, count in sorted(collisions.items())))
+
+
+if __name__ == "__main__":
+    main()
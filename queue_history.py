@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Programming Class Queue - History Store
+
+Keeps every accepted and cancelled request in an SQLite database so that question counts,
+the history of a student and reports of a class can be looked up across a whole course.
+Requests are written in batches by a background thread so the GUI never waits on the disk.
+"""
+
+__author__ = "Steven Yulong Yan"
+
+
+# ------ Imported Modules ------ #
+
+
+import argparse
+import sqlite3
+import sys
+import threading
+import time
+
+
+# ------ Global Variables ------ #
+
+
+BATCH_DELAY = 0.5  # The number of seconds a request may wait before being written
+BATCH_SIZE = 500  # The number of requests which are written without waiting for more
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    id INTEGER PRIMARY KEY,
+    queue TEXT NOT NULL,
+    name TEXT NOT NULL,
+    action TEXT NOT NULL,
+    questions INTEGER NOT NULL,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS requests_by_name ON requests (name, queue, action);
+CREATE INDEX IF NOT EXISTS requests_by_time ON requests (end_time, queue);
+"""
+
+
+# ------ The Store Class ------ #
+
+
+class HistoryStore:
+    """
+    An SQLite database of the accepted and cancelled requests
+    """
+
+    def __init__(self, path):
+        """
+        Open the database, creating it if needed, and start the thread writing to it.
+        :param path (str): The path of the database file
+        """
+        self.path = path
+        connection = self.connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+        self.pending = []  # The (queue, name, action, questions, start_time, end_time) rows not written yet
+        self.condition = threading.Condition()
+        self.closing = False
+        self.flushing = 0  # The number of callers waiting for the pending requests to be written
+        self.writing = False
+        self.stopped = False  # True once the writing thread has ended, after closing or failing
+        # The queue module of the standard library is shadowed by queue.py, hence the condition.
+        self.writer = threading.Thread(target=self.write, name="history-writer", daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        """
+        Open a connection to the database in write-ahead mode, so reading never waits for the writer.
+        :return (Connection): The connection
+        """
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def attach(self, queues):
+        """
+        Count the questions answered in earlier sessions in the given question queues,
+        then record every accepted and cancelled request of them.
+        :param queues: The question queues
+        """
+        for queue in queues:
+            queue.history.carry(self.counts(queue.name))
+            queue.listeners.append(self.record)
+
+    def record(self, change):
+        """
+        Queue a request to be written. This is a listener of the question queues.
+        :param change (Change): The change to a question queue, joins are not recorded
+        """
+        if change.action == "join":
+            return
+        recipient = change.recipient
+        row = (change.queue, recipient.name, change.action, recipient.questions, recipient.start_time,
+               round(time.time()))
+        with self.condition:
+            if self.stopped:
+                return
+            self.pending.append(row)
+            if len(self.pending) >= BATCH_SIZE:
+                self.condition.notify()
+
+    def write(self):
+        """
+        Write the pending requests in batches until the store is closed.
+        Each batch is a single transaction, and a batch which cannot be written is reported and dropped.
+        However the thread ends, flushing stops waiting for it.
+        """
+        try:
+            connection = self.connect()
+            try:
+                self.write_batches(connection)
+            finally:
+                connection.close()
+        except sqlite3.Error as error:
+            print("The history store cannot write to {}: {}".format(self.path, error), file=sys.stderr)
+        finally:
+            with self.condition:
+                self.stopped = True
+                self.writing = False
+                self.condition.notify_all()
+
+    def write_batches(self, connection):
+        """
+        Write the pending requests in batches until the store is closed.
+        :param connection (Connection): The connection to the database
+        """
+        while True:
+            with self.condition:
+                if not self.closing and not self.flushing and len(self.pending) < BATCH_SIZE:
+                    self.condition.wait(BATCH_DELAY)
+                rows, self.pending = self.pending, []
+                self.writing = bool(rows)
+                closing = self.closing
+            if rows:
+                try:
+                    with connection:
+                        connection.executemany("INSERT INTO requests (queue, name, action, questions, start_time, "
+                                               "end_time) VALUES (?, ?, ?, ?, ?, ?)", rows)
+                except sqlite3.Error as error:
+                    print("The history store has lost {} requests: {}".format(len(rows), error), file=sys.stderr)
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+            if closing and not rows:
+                break
+
+    def flush(self):
+        """
+        Wait until every request recorded so far has been written.
+        :raise RuntimeError: If the writing thread has stopped with requests left to write
+        """
+        with self.condition:
+            self.flushing += 1
+            self.condition.notify_all()
+            try:
+                while self.pending or self.writing:
+                    if self.stopped:
+                        raise RuntimeError("The history store has stopped writing to {}.".format(self.path))
+                    self.condition.wait()
+            finally:
+                self.flushing -= 1
+
+    def close(self):
+        """
+        Write the remaining requests and stop the writing thread.
+        """
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.writer.join()
+
+    def query(self, sql, parameters=()):
+        """
+        Run a query against everything recorded so far.
+        :param sql (str): The query
+        :param parameters (tuple): The parameters of the query
+        :return (list): The rows of the result
+        :raise RuntimeError: If the writing thread has stopped with requests left to write
+        """
+        self.flush()
+        connection = self.connect()
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def counts(self, queue):
+        """
+        Return the number of accepted requests of every student in a queue.
+        :param queue (str): The name of the question queue
+        :return (dict): The numbers of questions answered indexed by the student name
+        """
+        return dict(self.query("SELECT name, COUNT(*) FROM requests WHERE queue = ? AND action = 'confirm' "
+                               "GROUP BY name", (queue,)))
+
+    def student_history(self, name):
+        """
+        Return every accepted and cancelled request of a student, oldest first.
+        :param name (str): The name of the student
+        :return (list): The (queue, action, questions, start_time, end_time) rows
+        """
+        return self.query("SELECT queue, action, questions, start_time, end_time FROM requests "
+                          "WHERE name = ? ORDER BY end_time", (name,))
+
+    def session_report(self, start_time, end_time):
+        """
+        Summarise the requests which left a queue during a session.
+        :param start_time (int): The start of the session
+        :param end_time (int): The end of the session
+        :return (list): The (queue, action, requests, students, average wait) rows
+        """
+        return self.query("SELECT queue, action, COUNT(*), COUNT(DISTINCT name), AVG(end_time - start_time) "
+                          "FROM requests WHERE end_time BETWEEN ? AND ? GROUP BY queue, action "
+                          "ORDER BY queue, action", (start_time, end_time))
+
+
+# ------ Command Line ------ #
+
+
+def main():
+    """
+    Print the history of a student or a report of a session from a history database.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("database", help="path of the history database")
+    parser.add_argument("--student", help="print the requests of this student")
+    parser.add_argument("--hours", type=float, default=24,
+                        help="report the requests of the last given number of hours (24 by default)")
+    arguments = parser.parse_args()
+    store = HistoryStore(arguments.database)
+    if arguments.student:
+        for queue, action, questions, start_time, end_time in store.student_history(arguments.student):
+            print("{}  {:<6} {:<8} after {} questions, waited {} seconds"
+                  .format(time.strftime("%Y-%m-%d %H:%M", time.localtime(end_time)),
+                          queue, action, questions, end_time - start_time))
+    else:
+        now = round(time.time())
+        for queue, action, requests, students, average in store.session_report(now - arguments.hours * 3600, now):
+            print("{:<6} {:<8} {} requests from {} students, an average wait of {:.0f} seconds"
+                  .format(queue, action, requests, students, average))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
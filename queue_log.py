@@ -0,0 +1,227 @@
+"""
+Programming Class Queue - Write-Ahead Log
+
+Persists the question queues by appending every join, cancel and confirm to a log file
+and periodically writing a snapshot of the waiting recipients. The accepted requests only ever grow,
+so each snapshot appends the ones accepted since the previous snapshot to a history file instead of rewriting them,
+which keeps the cost of a snapshot from growing with the length of the session.
+On startup the latest snapshot and the history it covers are loaded and the records logged after it are replayed.
+The records of a batch follow a header giving their number and are only replayed if every one of them
+made it to the disk.
+"""
+
+__author__ = "Steven Yulong Yan"
+
+
+# ------ Imported Modules ------ #
+
+
+import json
+import os
+
+from queue_core import QueueError
+
+
+# ------ Global Variables ------ #
+
+
+SNAPSHOT_PERIOD = 1000  # The number of records logged between two snapshots
+
+
+def encode(record):
+    """
+    Encode a record of the log, or a message of the queue server, as a line of compact JSON.
+    :param record: The record or message
+    :return (bytes): The encoded line
+    """
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+# ------ The Log Class ------ #
+
+
+class QueueLog:
+    """
+    An append-only log of the changes to a set of question queues, with periodic snapshots
+    """
+
+    def __init__(self, path, snapshot_period=SNAPSHOT_PERIOD):
+        """
+        Construct a log. Nothing is read or written until the queues are recovered.
+        :param path (str): The path of the log file, the snapshot is kept next to it
+        :param snapshot_period (int): The number of records logged between two snapshots
+        """
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.history_path = path + ".history"
+        self.snapshot_period = snapshot_period
+        self.queues = {}  # The logged question queues indexed by their names
+        self.sequence = 0  # The sequence number of the last record
+        self.unsnapshotted = 0  # The number of records logged since the last snapshot
+        self.batch = []  # The encoded records of the batch being logged, written once its last change arrives
+        self.archived = {}  # The number of accepted requests of each queue already in the history file
+        self.history_size = 0  # The number of bytes of the history file covered by the last snapshot
+        self.file = None
+        self.history_file = None
+
+    def recover(self, queues):
+        """
+        Rebuild the queues from the latest snapshot and the records logged after it,
+        then log every later change to them.
+        :param queues: The question queues, which must be empty
+        """
+        for queue in queues:
+            self.queues[queue.name] = queue
+            self.archived[queue.name] = 0
+        snapshot_sequence, self.history_size = self.load_snapshot()
+        self.sequence = snapshot_sequence
+        offset = 0  # The end of the last complete record or batch
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as file:
+                unit = []  # The records read since the last complete record or batch
+                unit_length = 0
+                missing = 0  # The number of records of the batch being read which are still to come
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A record torn by a crash, everything after it is dropped.
+                        break
+                    unit.append(record)
+                    unit_length += len(line)
+                    if record[1] == "batch":
+                        missing = record[3]
+                        continue
+                    if missing > 1:
+                        missing -= 1
+                        continue
+                    missing = 0
+                    offset += unit_length
+                    for record in unit:
+                        if record[0] > snapshot_sequence:
+                            self.replay(record)
+                            self.sequence = record[0]
+                            self.unsnapshotted += 1
+                    unit = []
+                    unit_length = 0
+        self.file = open(self.path, "ab")
+        self.file.truncate(offset)
+        self.history_file = open(self.history_path, "ab")
+        # Accepted requests appended by a snapshot which did not make it to the disk are appended again.
+        self.history_file.truncate(self.history_size)
+        for queue in queues:
+            queue.listeners.append(self.record)
+
+    def load_snapshot(self):
+        """
+        Load the latest snapshot and the accepted requests of the history file it covers into the queues.
+        :return (tuple): The sequence number of the last record included in the snapshot
+                         and the number of bytes of the history file it covers
+        """
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            return 0, 0
+        history_size = snapshot.get("history", 0)
+        histories = {name: [] for name in self.queues}
+        if history_size:
+            with open(self.history_path, "rb") as file:
+                for line in file.read(history_size).splitlines():
+                    name, *entry = json.loads(line)
+                    if name in histories:
+                        histories[name].append(entry)
+        for name, queue in self.queues.items():
+            state = snapshot["queues"].get(name, {"waiting": []})
+            # Snapshots written before the history file held the accepted requests themselves.
+            queue.restore(state["waiting"], state.get("history", histories[name]))
+            self.archived[name] = len(histories[name])
+        return snapshot["sequence"], history_size
+
+    def replay(self, record):
+        """
+        Apply a logged record to its queue.
+        :param record (list): The [sequence, action, queue, name] record, with the start time for a join,
+                              or the [sequence, "batch", queue, size] header of a batch which changes nothing
+        """
+        queue = self.queues.get(record[2])
+        if queue is None:
+            return
+        try:
+            if record[1] == "join":
+                queue.join(record[3], record[4])
+            elif record[1] == "cancel":
+                queue.cancel(record[3])
+            elif record[1] == "confirm":
+                queue.confirm(record[3])
+        except QueueError:
+            pass
+
+    def record(self, change):
+        """
+        Append a change to the log, taking a snapshot once enough records have been logged.
+        The changes of a batch are written together with a single flush once its last change arrives.
+        This is a listener of the logged queues.
+        :param change (Change): The change to a logged queue
+        """
+        if change.pending and not self.batch:
+            self.sequence += 1
+            self.batch.append(encode([self.sequence, "batch", change.queue, change.pending + 1]))
+        self.sequence += 1
+        record = [self.sequence, change.action, change.queue, change.recipient.name]
+        if change.action == "join":
+            record.append(change.recipient.start_time)
+        self.batch.append(encode(record))
+        if change.pending:
+            return
+        self.file.write(b"".join(self.batch))
+        self.file.flush()
+        self.unsnapshotted += len(self.batch)
+        self.batch = []
+        if self.unsnapshotted >= self.snapshot_period:
+            self.snapshot()
+
+    def snapshot(self):
+        """
+        Append the requests accepted since the last snapshot to the history file, then write the waiting
+        recipients of every queue to the snapshot file and start a new log.
+        The snapshot replaces the previous one atomically and records the sequence number and the size of
+        the history file it covers, so records left in the log by a crash before it is emptied are not replayed
+        twice and requests appended to the history file by a snapshot which did not make it are ignored.
+        """
+        lines = []
+        for name, queue in self.queues.items():
+            lines += [encode([name, *entry]) for entry in queue.history.get_queue(self.archived[name])]
+            self.archived[name] = len(queue.history)
+        if lines:
+            data = b"".join(lines)
+            self.history_file.write(data)
+            self.history_file.flush()
+            os.fsync(self.history_file.fileno())
+            self.history_size += len(data)
+        snapshot = {
+            "sequence": self.sequence,
+            "history": self.history_size,
+            "queues": {name: {"waiting": queue.waiting.get_queue()} for name, queue in self.queues.items()},
+        }
+        temporary_path = self.snapshot_path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file, separators=(",", ":"))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.snapshot_path)
+        self.file.truncate(0)
+        self.unsnapshotted = 0
+
+    def close(self):
+        """
+        Take a final snapshot, so the next startup has nothing to replay, and close the log.
+        """
+        if self.file is None:
+            return
+        if self.unsnapshotted:
+            self.snapshot()
+        self.file.close()
+        self.history_file.close()
+        self.file = None
+        self.history_file = None
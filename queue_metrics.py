@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Programming Class Queue - Metrics
+
+Counts the joins, cancels and accepts of every question queue and measures its length, the waits of its students,
+its redraws and the frames of the games, cheaply enough to be always on.
+The metrics are exported in the Prometheus text format to a file or over HTTP on the loopback interface.
+"""
+
+__author__ = "Steven Yulong Yan"
+
+
+# ------ Imported Modules ------ #
+
+
+import argparse
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+# ------ Global Variables ------ #
+
+
+HOST = "127.0.0.1"
+WAIT_BUCKETS = (60, 120, 300, 600, 900, 1800, 3600, 7200)  # The wait time buckets in seconds
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)  # The call time buckets in seconds
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_value(value):
+    """
+    Format a sample value as Prometheus expects it.
+    :param value: The value
+    :return (str): The formatted value
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def format_labels(labels):
+    """
+    Format the labels of a sample.
+    :param labels (tuple): The (name, value) pairs of the labels
+    :return (str): The labels between braces, or nothing if there are none
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join('{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"')
+                                           .replace("\n", "\\n"))
+                          for name, value in labels) + "}"
+
+
+# ------ The Metric Classes ------ #
+
+
+class Counter:
+    """
+    A number which only ever goes up
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        """
+        Construct a counter at zero.
+        """
+        self.value = 0
+
+    def inc(self, amount=1):
+        """
+        Add to the counter.
+        :param amount: The amount added
+        """
+        self.value += amount
+
+    def samples(self, name, labels):
+        """
+        Return the samples of the counter.
+        :param name (str): The name of the metric
+        :param labels (tuple): The (name, value) pairs of the labels
+        :return (list): The (name, labels, value) samples
+        """
+        return [(name, labels, self.value)]
+
+
+class Gauge(Counter):
+    """
+    A number which may go up and down
+    """
+
+    __slots__ = ()
+
+    def set(self, value):
+        """
+        Replace the value of the gauge.
+        :param value: The new value
+        """
+        self.value = value
+
+
+class Histogram:
+    """
+    A distribution of observed values, counted into buckets by their upper bounds
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        """
+        Construct an empty histogram.
+        :param bounds (tuple): The upper bounds of the buckets in ascending order, without the infinite one
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The number of values in each bucket, the last one unbounded
+        self.sum = 0
+
+    def observe(self, value):
+        """
+        Count a value into its bucket.
+        :param value: The value
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self, function, *args):
+        """
+        Call a function and observe how many seconds it took.
+        :param function: The function to call
+        :param args: The arguments of the function
+        :return: The result of the function
+        """
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self, name, labels):
+        """
+        Return the samples of the histogram, with cumulative buckets as Prometheus expects them.
+        :param name (str): The name of the metric
+        :param labels (tuple): The (name, value) pairs of the labels
+        :return (list): The (name, labels, value) samples
+        """
+        samples = []
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            samples.append((name + "_bucket", labels + (("le", format_value(float(bound))),), total))
+        samples.append((name + "_sum", labels, self.sum))
+        samples.append((name + "_count", labels, total))
+        return samples
+
+
+# ------ The Registry Class ------ #
+
+
+class Metrics:
+    """
+    The metrics of a process, each family of metrics holding one metric per set of label values
+    """
+
+    def __init__(self):
+        """
+        Construct an empty registry.
+        """
+        self.families = {}  # The [type, help, metrics indexed by their labels] families indexed by their names
+        # Creating a metric is locked as the exporter may be reading the families from another thread,
+        # updating one is not as it only replaces a number.
+        self.lock = threading.Lock()
+
+    def metric(self, kind, name, help_text, labels, factory):
+        """
+        Return the metric of a family with the given labels, creating it if needed.
+        :param kind (str): The Prometheus type of the family
+        :param name (str): The name of the family
+        :param help_text (str): The description of the family
+        :param labels (dict): The label values
+        :param factory: The function constructing the metric
+        :return: The metric
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            family = self.families.setdefault(name, [kind, help_text, {}])
+            if family[0] != kind:
+                raise ValueError("{} is a {}, not a {}".format(name, family[0], kind))
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = factory()
+            return metric
+
+    def counter(self, name, help_text, **labels):
+        """
+        Return a counter, creating it if needed. Look it up once and keep it, as looking it up is not free.
+        :param name (str): The name of the family, ending in _total
+        :param help_text (str): The description of the family
+        :param labels: The label values
+        :return (Counter): The counter
+        """
+        return self.metric("counter", name, help_text, labels, Counter)
+
+    def gauge(self, name, help_text, **labels):
+        """
+        Return a gauge, creating it if needed.
+        :param name (str): The name of the family
+        :param help_text (str): The description of the family
+        :param labels: The label values
+        :return (Gauge): The gauge
+        """
+        return self.metric("gauge", name, help_text, labels, Gauge)
+
+    def histogram(self, name, help_text, bounds=DURATION_BUCKETS, **labels):
+        """
+        Return a histogram, creating it if needed.
+        :param name (str): The name of the family
+        :param help_text (str): The description of the family
+        :param bounds (tuple): The upper bounds of the buckets
+        :param labels: The label values
+        :return (Histogram): The histogram
+        """
+        return self.metric("histogram", name, help_text, labels, lambda: Histogram(bounds))
+
+    def render(self):
+        """
+        Return every metric in the Prometheus text format.
+        :return (str): The exposition
+        """
+        with self.lock:
+            families = [(name, kind, help_text, list(metrics.items()))
+                        for name, (kind, help_text, metrics) in sorted(self.families.items())]
+        lines = []
+        for name, kind, help_text, metrics in families:
+            lines.append("# HELP {} {}".format(name, help_text.replace("\\", "\\\\").replace("\n", "\\n")))
+            lines.append("# TYPE {} {}".format(name, kind))
+            for labels, metric in metrics:
+                for sample_name, sample_labels, value in metric.samples(name, labels):
+                    lines.append("{}{} {}".format(sample_name, format_labels(sample_labels), format_value(value)))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write every metric to a file for the textfile collector of a Prometheus node exporter.
+        The file is replaced atomically so it is never read half written.
+        :param path (str): The path of the file
+        """
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+        os.replace(temporary_path, path)
+
+    def serve(self, port, host=HOST):
+        """
+        Serve the metrics over HTTP from a background thread.
+        :param port (int): The port to listen on, 0 for any free port
+        :param host (str): The address to listen on, the loopback interface by default
+        :return (HTTPServer): The server, whose server_address holds the port listened on
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            The answer to a scrape of the metrics
+            """
+
+            def do_GET(self):
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        return server
+
+
+# ------ Queue Metrics ------ #
+
+
+class QueueMetrics:
+    """
+    The metrics of a set of question queues, following their changes
+    """
+
+    def __init__(self, metrics):
+        """
+        Construct the metrics of the question queues.
+        :param metrics (Metrics): The registry holding them
+        """
+        self.metrics = metrics
+        self.requests = {}  # The counters indexed by the (queue, action) of their requests
+        self.lengths = {}  # The gauges of the number of recipients waiting indexed by the queue
+        self.waits = {}  # The wait time histograms indexed by the (queue, action) ending the wait
+
+    def attach(self, queues):
+        """
+        Follow the changes of the given question queues.
+        :param queues: The question queues
+        """
+        for queue in queues:
+            for action in ("join", "cancel", "confirm"):
+                self.requests[queue.name, action] = self.metrics.counter(
+                    "class_queue_requests_total", "Joins, cancels and accepts of each question queue",
+                    queue=queue.name, action=action)
+            for action in ("cancel", "confirm"):
+                self.waits[queue.name, action] = self.metrics.histogram(
+                    "class_queue_wait_seconds", "Time waited by the students leaving each question queue",
+                    WAIT_BUCKETS, queue=queue.name, action=action)
+            self.lengths[queue.name] = self.metrics.gauge(
+                "class_queue_waiting", "Number of students waiting in each question queue", queue=queue.name)
+            self.lengths[queue.name].set(len(queue.waiting))
+            queue.listeners.append(self.record)
+
+    def record(self, change):
+        """
+        Count a change. This is a listener of the question queues.
+        :param change (Change): The change to a question queue
+        """
+        self.requests[change.queue, change.action].value += 1
+        self.lengths[change.queue].value = change.waiting
+        if change.action != "join":
+            self.waits[change.queue, change.action].observe(time.time() - change.recipient.start_time)
+
+
+# ------ Command Line ------ #
+
+
+def main():
+    """
+    Time the updates of the metrics, to check they are cheap enough to stay on.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=1000000, help="number of timed updates of each kind")
+    arguments = parser.parse_args()
+    metrics = Metrics()
+    counter = metrics.counter("bench_total", "Counter updates")
+    histogram = metrics.histogram("bench_seconds", "Histogram updates")
+    for title, function, argument in (("counter increment", counter.inc, 1),
+                                      ("histogram observation", histogram.observe, 0.003)):
+        start = time.perf_counter()
+        for _ in range(arguments.repeat):
+            function(argument)
+        print("{:<24}{:>8.0f}ns".format(title, (time.perf_counter() - start) / arguments.repeat * 1e9))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Programming Class Queue - Profiler
+
+Profiles the hot paths of the application, such as the redraws, the requests and the game frames, when switched on.
+Every call of a hot path is timed, profiled with cProfile and has its allocations traced with tracemalloc.
+Reports are written periodically as a readable text file and a JSON summary, keeping only the latest ones,
+and the summaries of two runs can be compared from the command line.
+"""
+
+__author__ = "Steven Yulong Yan"
+
+
+# ------ Imported Modules ------ #
+
+
+import argparse
+import cProfile
+import functools
+import glob
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from array import array
+
+
+# ------ Global Variables ------ #
+
+
+KEEP = 20  # The number of reports kept in the report directory
+TOP = 15  # The number of functions and allocation sites listed for each report
+TRACE_FRAMES = 1  # The number of frames stored for each traced allocation
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(samples, p):
+    """
+    Return a percentile of sorted samples.
+    :param samples: The sorted samples
+    :param p (int): The percentile
+    :return (float): The sample at the percentile or 0 if there are none
+    """
+    if not samples:
+        return 0
+    return samples[min(len(samples) * p // 100, len(samples) - 1)]
+
+
+# ------ The Profiler Classes ------ #
+
+
+class HotPath:
+    """
+    The calls of a hot path profiled since the last report
+    """
+
+    def __init__(self, name):
+        """
+        Construct a hot path with no calls.
+        :param name (str): The name of the hot path
+        """
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the calls profiled so far.
+        """
+        self.profile = cProfile.Profile()
+        self.durations = array("d")  # The number of seconds taken by each call
+        self.allocated = 0  # The number of bytes allocated and kept by the calls
+        self.peak = 0  # The most bytes allocated at once during a call
+
+    def summary(self):
+        """
+        Summarise the calls of the hot path.
+        :return (dict): The number of calls, the timings in seconds and the allocations in bytes
+        """
+        durations = sorted(self.durations)
+        calls = len(durations)
+        summary = {"calls": calls, "total": sum(durations), "mean": sum(durations) / calls if calls else 0}
+        for p in PERCENTILES:
+            summary["p{}".format(p)] = percentile(durations, p)
+        summary["max"] = durations[-1] if durations else 0
+        summary["allocated per call"] = self.allocated / calls if calls else 0
+        summary["peak"] = self.peak
+        return summary
+
+    def functions(self):
+        """
+        List the functions taking the most time within the calls of the hot path.
+        :return (str): The cProfile statistics sorted by cumulative time
+        """
+        stream = io.StringIO()
+        try:
+            pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(TOP)
+        except TypeError:
+            # The profile is empty if another profiler was running during every call.
+            return ""
+        return stream.getvalue()
+
+
+class Profiler:
+    """
+    The profiler of the hot paths of the application, which is off and costs nothing unless given a directory
+    """
+
+    def __init__(self, directory=None, keep=KEEP):
+        """
+        Construct a profiler, starting to trace allocations if it is on.
+        :param directory (str): The directory the reports are written to, None to switch profiling off
+        :param keep (int): The number of reports kept in the directory
+        """
+        self.directory = directory
+        self.keep = keep
+        self.paths = {}  # The hot paths indexed by their names
+        self.active = False  # True while a hot path is being profiled, as cProfile cannot profile two at once
+        self.started = time.time()  # The time since which the calls of the next report were made
+        self.sequence = 0  # The number of reports written by the profiler
+        self.snapshot = None  # The allocations traced at the time of the last report
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            tracemalloc.start(TRACE_FRAMES)
+
+    def wrap(self, name, function):
+        """
+        Return a function profiled as a hot path, or the function itself if profiling is off.
+        A hot path called within another one is profiled as part of the outer one.
+        :param name (str): The name of the hot path
+        :param function: The function
+        :return: The profiled function
+        """
+        if self.directory is None:
+            return function
+        path = self.paths.setdefault(name, HotPath(name))
+
+        @functools.wraps(function)
+        def profiled(*args, **kwargs):
+            if self.active:
+                return function(*args, **kwargs)
+            self.active = True
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            try:
+                path.profile.enable()
+            except ValueError:
+                # Another profiler is running, so the call is only timed and traced.
+                pass
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                path.durations.append(time.perf_counter() - start)
+                path.profile.disable()
+                current, peak = tracemalloc.get_traced_memory()
+                path.allocated += current - before
+                path.peak = max(path.peak, peak - before)
+                self.active = False
+
+        return profiled
+
+    def report(self):
+        """
+        Write the report of the calls profiled since the last report and start collecting the next one,
+        then delete the oldest reports beyond the number kept.
+        :return (str): The path of the JSON summary of the report or None if profiling is off
+        """
+        if self.directory is None:
+            return None
+        now = time.time()
+        self.sequence += 1
+        base = os.path.join(self.directory, "profile-{}-{:03d}".format(
+            time.strftime("%Y%m%d-%H%M%S", time.localtime(now)), self.sequence))
+        summary = {"start": self.started, "end": now,
+                   "paths": {name: path.summary() for name, path in sorted(self.paths.items())}}
+        lines = ["Profile from {} to {}".format(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+                                                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))),
+                 "",
+                 "    {:<40}{:>9}{:>11}".format("hot path", "calls", "mean") +
+                 "".join("{:>11}".format("p{}".format(p)) for p in PERCENTILES) +
+                 "{:>11}{:>14}{:>12}".format("max", "bytes/call", "peak")]
+        for name, stats in summary["paths"].items():
+            lines.append("    {:<40}{:>9}".format(name, stats["calls"]) +
+                         "".join("{:>9.1f}us".format(stats[key] * 1e6)
+                                 for key in ["mean"] + ["p{}".format(p) for p in PERCENTILES] + ["max"]) +
+                         "{:>14.0f}{:>12}".format(stats["allocated per call"], stats["peak"]))
+        for name, path in sorted(self.paths.items()):
+            if path.durations:
+                lines += ["", "--- {} ---".format(name), path.functions()]
+        lines += self.allocations()
+        with open(base + ".txt", "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        with open(base + ".json", "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=1)
+        for path in self.paths.values():
+            path.reset()
+        self.started = now
+        self.rotate()
+        return base + ".json"
+
+    def allocations(self):
+        """
+        List the sites holding the most traced memory and those which grew the most since the last report.
+        :return (list): The lines of the listing
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        lines = ["", "--- allocations ---"]
+        lines += [str(statistic) for statistic in snapshot.statistics("lineno")[:TOP]]
+        if self.snapshot is not None:
+            lines += ["", "--- growth since the last report ---"]
+            lines += [str(statistic) for statistic in snapshot.compare_to(self.snapshot, "lineno")[:TOP]]
+        self.snapshot = snapshot
+        return lines
+
+    def rotate(self):
+        """
+        Delete the oldest reports beyond the number kept.
+        """
+        summaries = sorted(glob.glob(os.path.join(self.directory, "profile-*.json")))
+        for path in summaries[:max(len(summaries) - self.keep, 0)]:
+            for extension in (".json", ".txt"):
+                try:
+                    os.remove(path[:-len(".json")] + extension)
+                except FileNotFoundError:
+                    pass
+
+
+# ------ Command Line ------ #
+
+
+def compare(old_path, new_path):
+    """
+    Print the change of every hot path between two report summaries.
+    :param old_path (str): The path of the older summary
+    :param new_path (str): The path of the newer summary
+    """
+    with open(old_path, encoding="utf-8") as file:
+        old = json.load(file)["paths"]
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)["paths"]
+    print("{} -> {}".format(os.path.basename(old_path), os.path.basename(new_path)))
+    print("    {:<40}{:>17}{:>28}{:>28}{:>26}".format("hot path", "calls", "mean", "p99", "bytes/call"))
+    for name in sorted(set(old) | set(new)):
+        before = old.get(name, {})
+        after = new.get(name, {})
+        cells = ["{:>8} {:>8}".format(before.get("calls", "-"), after.get("calls", "-"))]
+        for key, scale, unit in (("mean", 1e6, "us"), ("p99", 1e6, "us"), ("allocated per call", 1, "B")):
+            if key in before and key in after:
+                change = "{:+.0f}%".format((after[key] - before[key]) / before[key] * 100) if before[key] else ""
+                cells.append("{:>9.1f}{} {:>8.1f}{} {:>5}".format(before[key] * scale, unit, after[key] * scale,
+                                                                  unit, change))
+            else:
+                cells.append("{:>24}".format("-"))
+        print("    {:<40}".format(name) + "".join(cells))
+
+
+def main():
+    """
+    Compare two report summaries, or the two latest ones of a report directory.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="a report directory, or the older and the newer JSON summaries")
+    arguments = parser.parse_args()
+    if len(arguments.paths) == 1:
+        summaries = sorted(glob.glob(os.path.join(arguments.paths[0], "profile-*.json")))
+        if len(summaries) < 2:
+            parser.error("fewer than two reports in {}".format(arguments.paths[0]))
+        compare(*summaries[-2:])
+    else:
+        compare(*arguments.paths[:2])
+
+
+if __name__ == "__main__":
+    main()
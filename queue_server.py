@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Programming Class Queue - Network Server
+
+Shares one set of question queues between the terminals of a lab over a local TCP connection.
+Every message is a JSON object on its own line. A client sends requests such as
+{"id": 1, "op": "join", "queue": "quick", "name": "Peter O'Shea"}, or {"id": 2, "op": "confirm_many", "queue": "quick",
+"names": [...]} for a batch applied as one transaction, and receives one reply per request,
+while every change to the queues is pushed to all clients as an event such as
+{"event": "join", "queue": "quick", "position": 3, "recipient": ["Peter O'Shea", 0, 1500000000], "count": 0,
+"waiting": 12, "start_time_sum": 18000000000, "pending": 0}, so mirroring a queue costs as much as its changes,
+not its size. A batch is pushed as one event per recipient, "pending" counting the events of the batch still to come.
+"""
+
+__author__ = "Steven Yulong Yan"
+
+
+# ------ Imported Modules ------ #
+
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+
+from queue_core import (AlreadyQueuedError, Change, InAnotherQueueError, QuestionQueue, QueueError, QueueRegistry,
+                        Recipient, name_problem)
+from queue_history import HistoryStore
+from queue_log import QueueLog, encode
+from queue_metrics import Metrics, QueueMetrics
+
+
+# ------ Global Variables ------ #
+
+
+HOST = "127.0.0.1"
+PORT = 8642
+QUEUE_NAMES = ("quick", "long")  # The question queues served by default
+OPS = ("join", "cancel", "confirm")  # The requests on a single recipient
+BATCH_OPS = ("join_many", "cancel_many", "confirm_many", "clear")  # The requests on several recipients at once
+SEND_LIMIT = 1 << 20  # The number of bytes buffered for a client before it is dropped as too slow
+TIMEOUT = 5  # The number of seconds a client waits for a reply before giving the server up
+
+
+def valid_name(name):
+    """
+    Check a name sent by a client, applying the same rules as the GUI.
+    :param name: The name
+    :return (bool): True if the name is a string passing verification and False otherwise
+    """
+    return isinstance(name, str) and name_problem(name) is None
+
+
+# ------ The Server Class ------ #
+
+
+class QueueServer:
+    """
+    A server applying the requests of its clients to the question queues and pushing every change back to them
+    """
+
+    def __init__(self, queues, host=HOST, port=PORT):
+        """
+        Construct a server for the given question queues.
+        :param queues: The question queues
+        :param host (str): The address to listen on
+        :param port (int): The port to listen on, 0 for any free port
+        """
+        self.queues = {queue.name: queue for queue in queues}
+        self.host = host
+        self.port = port
+        self.clients = set()  # The stream writers of the connected clients
+        self.server = None
+        for queue in queues:
+            queue.listeners.append(self.broadcast)
+
+    async def start(self):
+        """
+        Start listening, updating the port if any free port was requested.
+        """
+        # The socket is bound here because asyncio would resolve the host in a thread pool,
+        # whose import of the queue module of the standard library would load queue.py instead.
+        listener = socket.create_server((self.host, self.port))
+        self.server = await asyncio.start_server(self.serve, sock=listener)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """
+        Stop listening and disconnect every client.
+        """
+        self.server.close()
+        for writer in list(self.clients):
+            writer.close()
+        await self.server.wait_closed()
+
+    async def serve(self, reader, writer):
+        """
+        Answer the requests of a client until it disconnects.
+        :param reader (StreamReader): The stream of requests
+        :param writer (StreamWriter): The stream of replies and events
+        """
+        self.clients.add(writer)
+        try:
+            async for line in reader:
+                writer.write(encode(self.handle(json.loads(line))))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # The server is shutting down. Finishing the task normally keeps asyncio from logging
+            # a traceback for every client still connected.
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def handle(self, request):
+        """
+        Apply a request to the question queues.
+        :param request (dict): The request with its "id", "op" and, except for "state", "queue" and "name",
+                               or "names" for a batch other than "clear"
+        :return (dict): The reply, with the error "BadRequest" if the request is malformed or a name is not valid
+        """
+        if not isinstance(request, dict):
+            return {"id": None, "ok": False, "error": "BadRequest"}
+        reply = {"id": request.get("id"), "ok": True}
+        op = request.get("op")
+        if op == "state":
+            reply["queues"] = {name: queue.waiting.get_queue() for name, queue in self.queues.items()}
+            return reply
+        queue = self.queues.get(request.get("queue")) if isinstance(request.get("queue"), str) else None
+        names = request.get("names")
+        if (queue is None or op not in OPS + BATCH_OPS or
+                (op in OPS and not valid_name(request.get("name"))) or
+                (op in BATCH_OPS and op != "clear" and
+                 not (isinstance(names, list) and all(valid_name(name) for name in names)))):
+            reply.update(ok=False, error="BadRequest")
+            return reply
+        try:
+            if op == "clear":
+                reply["recipients"] = queue.clear()
+            elif op in BATCH_OPS:
+                reply["recipients"] = getattr(queue, op)(names)
+            else:
+                reply["recipient"] = getattr(queue, op)(request["name"])
+        except QueueError as error:
+            reply.update(ok=False, error=type(error).__name__, queue=error.queue.name)
+        return reply
+
+    def broadcast(self, change):
+        """
+        Push a change to every client, dropping the clients which cannot keep up.
+        This is a listener of the question queues.
+        :param change (Change): The change to a question queue
+        """
+        line = encode(change.message())
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > SEND_LIMIT:
+                self.clients.discard(writer)
+                writer.close()
+            else:
+                writer.write(line)
+
+
+# ------ The Client Classes ------ #
+
+
+class QueueClient:
+    """
+    A blocking connection to a queue server, receiving its events on a background thread
+    """
+
+    def __init__(self, host=HOST, port=PORT, timeout=TIMEOUT):
+        """
+        Connect to a queue server.
+        :param host (str): The address of the server
+        :param port (int): The port of the server
+        :param timeout (float): The number of seconds to wait for each reply
+        """
+        self.socket = socket.create_connection((host, port), timeout)
+        self.socket.settimeout(None)
+        self.timeout = timeout
+        self.queues = {}  # The mirrored question queues indexed by their names
+        self.inbox = []  # The events received but not yet applied
+        # The [arrived, reply, events received before the reply] of the requests in flight indexed by their ids
+        self.replies = {}
+        self.lock = threading.Lock()
+        self.sequence = 0
+        self.connected = True
+        self.reader = threading.Thread(target=self.receive, name="queue-client", daemon=True)
+        self.reader.start()
+
+    def receive(self):
+        """
+        Sort the lines sent by the server into replies and events until the connection closes.
+        """
+        try:
+            for line in self.socket.makefile("rb"):
+                message = json.loads(line)
+                with self.lock:
+                    if "event" in message:
+                        self.inbox.append(message)
+                    elif message.get("id") in self.replies:
+                        pending = self.replies[message["id"]]
+                        pending[1] = message
+                        pending[2] = len(self.inbox)
+                        pending[0].set()
+        except (OSError, ValueError):
+            pass
+        with self.lock:
+            self.connected = False
+            for pending in self.replies.values():
+                pending[0].set()
+
+    def request(self, op, queue=None, name=None, names=None):
+        """
+        Send a request and wait for its reply, then apply the events received so far.
+        :param op (str): One of OPS and BATCH_OPS
+        :param queue (str): The name of the question queue
+        :param name (str): The name of the recipient
+        :param names (list): The names of the recipients of a batch
+        :return (dict): The reply
+        :raise ConnectionError: If the server is unreachable or does not reply in time
+        """
+        reply = self.exchange(op, queue, name, names)[0]
+        self.drain()
+        return reply
+
+    def exchange(self, op, queue=None, name=None, names=None):
+        """
+        Send a request and wait for its reply.
+        :param op (str): One of "state", OPS and BATCH_OPS
+        :param queue (str): The name of the question queue
+        :param name (str): The name of the recipient
+        :param names (list): The names of the recipients of a batch
+        :return (tuple): The reply and the number of events in the inbox when it arrived
+        :raise ConnectionError: If the server is unreachable or does not reply in time
+        """
+        with self.lock:
+            if not self.connected:
+                raise ConnectionError("The queue server has closed the connection.")
+            self.sequence += 1
+            pending = [threading.Event(), None, 0]
+            self.replies[self.sequence] = pending
+            request = {"id": self.sequence, "op": op, "queue": queue, "name": name}
+            if names is not None:
+                request["names"] = list(names)
+        try:
+            self.socket.sendall(encode(request))
+            # A reply arriving after the timeout is dropped, the events of the request still update the mirrors.
+            replied = pending[0].wait(self.timeout)
+        except OSError as error:
+            raise ConnectionError("The queue server is unreachable.") from error
+        finally:
+            with self.lock:
+                del self.replies[request["id"]]
+        if not replied:
+            raise ConnectionError("The queue server has not replied in time.")
+        if pending[1] is None:
+            raise ConnectionError("The queue server has closed the connection.")
+        return pending[1], pending[2]
+
+    def sync(self):
+        """
+        Replace the state of the mirrored queues with the one of the server.
+        """
+        reply, received = self.exchange("state")
+        with self.lock:
+            # The events which arrived before the state are already part of it.
+            del self.inbox[:received]
+        for name, waiting in reply["queues"].items():
+            if name in self.queues:
+                self.queues[name].restore(waiting, [])
+
+    def drain(self):
+        """
+        Apply the events received so far to the mirrored queues. This must be called by the thread using them.
+        :return (bool): True if any event was applied and False otherwise
+        """
+        with self.lock:
+            events, self.inbox = self.inbox, []
+        for event in events:
+            queue = self.queues.get(event["queue"])
+            if queue is not None:
+                queue.apply(Change.from_message(event))
+        return bool(events)
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        self.socket.close()
+
+
+class RemoteQuestionQueue(QuestionQueue):
+    """
+    A mirror of a question queue held by a queue server.
+    Requests are forwarded to the server and the mirror only changes when the server reports it.
+    """
+
+    def __init__(self, name, client):
+        """
+        Construct the mirror of a question queue.
+        :param name (str): The name of the question queue on the server
+        :param client (QueueClient): The connection to the server
+        """
+        super().__init__(name)
+        self.client = client
+        self.batch = []  # The changes of a batch reported so far, applied once its last change arrives
+        client.queues[name] = self
+
+    def forward(self, op, name=None, names=None):
+        """
+        Forward a request to the server.
+        :param op (str): One of OPS and BATCH_OPS
+        :param name (str): The name of the recipient
+        :param names: The names of the recipients of a batch
+        :return: The affected entry or None if the recipient was not queued, or the list of affected entries of a batch
+        :raise AlreadyQueuedError: If a recipient is already waiting in the queue
+        :raise InAnotherQueueError: If a recipient is already waiting in another queue
+        :raise ConnectionError: If the server is unreachable or does not reply in time
+        :raise ValueError: If the server rejects the request as malformed
+        """
+        reply = self.client.request(op, self.name, name, names)
+        if not reply["ok"]:
+            other = self.client.queues.get(reply.get("queue"), self)
+            if reply["error"] == "AlreadyQueuedError":
+                raise AlreadyQueuedError(other)
+            if reply["error"] == "InAnotherQueueError":
+                raise InAnotherQueueError(other)
+            raise ValueError(reply["error"])
+        if op in BATCH_OPS:
+            return [Recipient(*recipient) for recipient in reply["recipients"]]
+        return None if reply["recipient"] is None else Recipient(*reply["recipient"])
+
+    def join(self, name, start_time=None):
+        return self.forward("join", name)
+
+    def cancel(self, name):
+        return self.forward("cancel", name)
+
+    def confirm(self, name):
+        return self.forward("confirm", name)
+
+    def join_many(self, names, start_time=None):
+        return self.forward("join_many", names=names)
+
+    def cancel_many(self, names):
+        return self.forward("cancel_many", names=names)
+
+    def confirm_many(self, names):
+        return self.forward("confirm_many", names=names)
+
+    def clear(self):
+        return self.forward("clear")
+
+    def apply(self, change):
+        """
+        Apply a change reported by the server and tell the listeners about it.
+        The changes of a batch are held back until its last one arrives, then applied with a single ordering update.
+        :param change (Change): The change to the question queue on the server
+        """
+        self.batch.append(change)
+        if change.pending:
+            return
+        batch, self.batch = self.batch, []
+        recipients = [change.recipient for change in batch]
+        if change.action == "join":
+            self.waiting.add_many(recipients)
+        else:
+            self.waiting.remove_many([recipient.name for recipient in recipients])
+            if change.action == "confirm":
+                for recipient in recipients:
+                    self.history.append(recipient)
+        for change in batch:
+            if self.registry is not None:
+                self.registry.move(change.action, change.recipient.name, self)
+            # The change of the server is passed on as is, as the mirror does not hold the history of the server.
+            for listener in self.listeners:
+                listener(change)
+
+
+# ------ Command Line ------ #
+
+
+async def serve_forever(arguments):
+    """
+    Run a queue server for the requested question queues until interrupted.
+    :param arguments: The parsed command line
+    """
+    registry = QueueRegistry(QuestionQueue(name) for name in arguments.queues)
+    queue_log = None
+    if arguments.log:
+        queue_log = QueueLog(arguments.log)
+        queue_log.recover(registry)
+    history_store = None
+    if arguments.history:
+        history_store = HistoryStore(arguments.history)
+        history_store.attach(registry)
+    if arguments.metrics_port is not None:
+        metrics = Metrics()
+        QueueMetrics(metrics).attach(registry)
+        metrics.serve(arguments.metrics_port)
+    server = QueueServer(registry, arguments.host, arguments.port)
+    await server.start()
+    print("Serving the class queue on {}:{}".format(arguments.host, server.port))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        if queue_log is not None:
+            queue_log.close()
+        if history_store is not None:
+            history_store.close()
+
+
+def main():
+    """
+    Parse the command line and run the server.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=HOST, help="address to listen on ({} by default)".format(HOST))
+    parser.add_argument("--port", type=int, default=PORT, help="port to listen on ({} by default)".format(PORT))
+    parser.add_argument("--log", help="path of the log the queues are saved to")
+    parser.add_argument("--history", help="path of the SQLite database the requests are archived in")
+    parser.add_argument("--queues", nargs="+", default=list(QUEUE_NAMES),
+                        help="names of the question queues to serve ({} by default)".format(" ".join(QUEUE_NAMES)))
+    parser.add_argument("--metrics-port", type=int,
+                        help="port to serve the metrics of the queues on, over HTTP on the loopback interface")
+    try:
+        asyncio.run(serve_forever(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
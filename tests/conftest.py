@@ -0,0 +1,12 @@
+"""
+Programming Class Queue - Test Configuration
+
+Makes the modules of the application importable by the tests.
+The directory is appended rather than prepended to the path, as queue.py would otherwise shadow
+the queue module of the standard library.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,101 @@
+"""
+Tests of the physics of the Paddle Ball games and their headless simulation.
+"""
+
+import pytest
+
+from queue_game import BOARD_HEIGHT, Box, DoubleGame, SingleGame, Vector, simulate, time_of_impact
+
+
+# ------ Swept Moves ------ #
+
+
+def test_time_of_impact():
+    assert time_of_impact(10, 20, 20) == 0.5
+    assert time_of_impact(10, 20, 40) is None
+    assert time_of_impact(10, -20, 20) is None
+    # An edge already on the line is leaving it.
+    assert time_of_impact(20, 5, 20) is None
+    assert time_of_impact(20, 0, 20) is None
+
+
+@pytest.mark.parametrize("speed", [4, 50, 90, 400])
+def test_fast_sphere_bounces_off_platform(speed):
+    game = SingleGame()
+    game.sphere = Box(560, 573, 25, 25)
+    game.sphere.velocity = Vector(0, speed)
+    # Without sweeping, a step of the faster spheres would carry them through the 10 pixel thick platform.
+    game.step(1)
+    assert not game.bottom_hit
+    assert game.collisions == {"platform": 1}
+    assert game.sphere.velocity.y < 0
+    assert game.sphere.bottom <= game.platform.top
+
+
+def test_fast_sphere_bounces_off_moving_platform():
+    game = SingleGame()
+    game.sphere = Box(440, 500, 25, 25)
+    game.sphere.velocity = Vector(0, 5)
+    game.press("left")
+    # The sphere starts beside the platform, which moves under it while it falls a whole frame of a slow game.
+    game.step(20)
+    assert not game.bottom_hit
+    assert game.collisions["platform"] == 1
+
+
+def test_fast_sphere_misses_platform_beside_it():
+    game = SingleGame()
+    game.sphere = Box(100, 560, 25, 25)
+    game.sphere.velocity = Vector(0, 400)
+    game.step(1)
+    assert game.bottom_hit
+    assert game.result() == "lost"
+
+
+def test_fast_sphere_hits_target_it_crosses():
+    game = SingleGame()
+    centre = game.target_left.centre
+    game.sphere = Box(centre.x - 12.5, centre.y + 200, 25, 25)
+    game.sphere.velocity = Vector(0, -500)
+    # The sphere passes through the target within one step and is past it at the end of the step.
+    game.step(1)
+    assert game.left_hit
+    assert not game.target_left.contains(game.sphere)
+
+
+@pytest.mark.parametrize("speed", [4, 100, 600])
+def test_fast_ball_bounces_off_paddles(speed):
+    game = DoubleGame()
+    game.ball = Box(500, 330, 15, 15)
+    game.ball.velocity = Vector(-speed, 0)
+    for _ in range(1000 // speed + 2):
+        game.step(1)
+    assert game.result() is None
+    assert game.collisions["paddle"] >= 1
+    assert game.left_paddle.right <= game.ball.left
+    assert game.ball.right <= game.right_paddle.left
+
+
+def test_fast_ball_passes_beside_paddle():
+    game = DoubleGame()
+    game.ball = Box(500, BOARD_HEIGHT - 40, 15, 15)
+    game.ball.velocity = Vector(-600, 0)
+    game.step(1)
+    assert game.result() == "blue"
+
+
+# ------ Headless Simulation ------ #
+
+
+@pytest.mark.parametrize("name", ["single", "double"])
+def test_same_seed_same_simulation(name):
+    first = simulate(name, 7, 20, duration=1.7, step_limit=3000)
+    second = simulate(name, 7, 20, duration=1.7, step_limit=3000)
+    # The last value is the time taken, which varies.
+    assert first[:3] == second[:3]
+    assert sum(first[1].values()) == 20
+
+
+def test_simulation_replays_script():
+    script = {0: ["left"], 30: ["pause"], 60: ["right"]}
+    assert simulate("single", 3, 2, script=script)[:3] == simulate("single", 3, 2, script=script)[:3]
@@ -0,0 +1,113 @@
+"""
+Tests of the SQLite history store.
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from queue_core import QuestionQueue, QueueRegistry
+from queue_history import HistoryStore
+
+
+# ------ Helpers ------ #
+
+
+def open_store(tmp_path, store_class=HistoryStore):
+    """
+    Open the store of a directory and attach it to new quick and long queues, as a startup does.
+    :param tmp_path (Path): The directory
+    :param store_class: The class of the store
+    :return (tuple): The store and the registry of the queues
+    """
+    registry = QueueRegistry([QuestionQueue("quick"), QuestionQueue("long")])
+    store = store_class(str(tmp_path / "history.db"))
+    store.attach(registry)
+    return store, registry
+
+
+class FailingStore(HistoryStore):
+    """
+    A history store whose writing thread fails as soon as it starts
+    """
+
+    def write_batches(self, connection):
+        raise sqlite3.OperationalError("disk I/O error")
+
+
+# ------ Tests ------ #
+
+
+def test_lookups(tmp_path):
+    store, registry = open_store(tmp_path)
+    registry["quick"].join_many(["Ann", "Bob"], 100)
+    registry["quick"].confirm("Ann")
+    registry["quick"].cancel("Bob")
+    registry["long"].join("Ann", 200)
+    registry["long"].confirm("Ann")
+    assert store.counts("quick") == {"Ann": 1}
+    # Both requests left their queue within the same second, so their order is not fixed.
+    assert sorted(row[:3] for row in store.student_history("Ann")) == [("long", "confirm", 0), ("quick", "confirm", 0)]
+    now = round(time.time())
+    assert [row[:4] for row in store.session_report(now - 60, now + 60)] == \
+        [("long", "confirm", 1, 1), ("quick", "cancel", 1, 1), ("quick", "confirm", 1, 1)]
+    store.close()
+
+
+def test_questions_asked_survive_restarts(tmp_path):
+    store, registry = open_store(tmp_path)
+    for start_time in (100, 200):
+        registry["quick"].join("Ann", start_time)
+        registry["quick"].confirm("Ann")
+    store.close()
+    # A new session without the log of the last one still counts the questions answered.
+    store, registry = open_store(tmp_path)
+    assert registry["quick"].join("Ann").questions == 2
+    assert registry["long"].join("Bob").questions == 0
+    registry["quick"].confirm("Ann")
+    assert registry["quick"].join("Ann").questions == 3
+    store.close()
+
+
+def test_counts_are_not_doubled_with_restored_history(tmp_path):
+    store, registry = open_store(tmp_path)
+    registry["quick"].join("Ann", 100)
+    registry["quick"].confirm("Ann")
+    store.close()
+    # The log of the last session restores the same accepted request the store holds.
+    registry = QueueRegistry([QuestionQueue("quick"), QuestionQueue("long")])
+    registry["quick"].restore([], [("Ann", 0, 100)])
+    store = HistoryStore(str(tmp_path / "history.db"))
+    store.attach(registry)
+    assert registry["quick"].history.count("Ann") == 1
+    store.close()
+
+
+def test_failed_batch_is_reported(tmp_path, capsys):
+    store, registry = open_store(tmp_path)
+    connection = sqlite3.connect(str(tmp_path / "history.db"))
+    connection.execute("DROP TABLE requests")
+    connection.close()
+    registry["quick"].join("Ann", 100)
+    registry["quick"].confirm("Ann")
+    store.flush()
+    assert "has lost 1 requests" in capsys.readouterr().err
+    store.close()
+
+
+def test_flush_fails_fast_once_writer_has_stopped(tmp_path, capsys):
+    store, registry = open_store(tmp_path, FailingStore)
+    store.writer.join(5)
+    assert store.stopped
+    assert "disk I/O error" in capsys.readouterr().err
+    registry["quick"].join("Ann", 100)
+    registry["quick"].confirm("Ann")
+    # Requests recorded once the writer has stopped are dropped rather than kept forever.
+    store.flush()
+    store.pending.append(("quick", "Bob", "confirm", 0, 100, 200))
+    with pytest.raises(RuntimeError):
+        store.flush()
+    with pytest.raises(RuntimeError):
+        store.counts("quick")
+    store.close()
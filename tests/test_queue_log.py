@@ -0,0 +1,192 @@
+"""
+Tests of the recovery of the question queues from the write-ahead log, its snapshots and its history file.
+"""
+
+import json
+
+from queue_core import QuestionQueue, QueueRegistry
+from queue_log import QueueLog
+
+
+# ------ Helpers ------ #
+
+
+def open_log(tmp_path, snapshot_period=1000):
+    """
+    Recover the quick and long queues from the log in a directory, as a startup does.
+    :param tmp_path (Path): The directory
+    :param snapshot_period (int): The number of records logged between two snapshots
+    :return (tuple): The log and the registry of the recovered queues
+    """
+    registry = QueueRegistry([QuestionQueue("quick"), QuestionQueue("long")])
+    log = QueueLog(str(tmp_path / "class_queue.log"), snapshot_period)
+    log.recover(registry)
+    return log, registry
+
+
+def state(registry):
+    """
+    Return the waiting recipients and the history of every queue.
+    :param registry (QueueRegistry): The question queues
+    :return (dict): The (waiting, history) lists indexed by the name of the queue
+    """
+    return {queue.name: (queue.waiting.get_queue(), queue.history.get_queue()) for queue in registry}
+
+
+def crash(log):
+    """
+    Drop a log without its final snapshot, as a crash does. Every complete record is already flushed.
+    :param log (QueueLog): The log
+    """
+    log.file.close()
+    log.history_file.close()
+
+
+# ------ Tests ------ #
+
+
+def test_recover_after_close(tmp_path):
+    log, registry = open_log(tmp_path)
+    registry["quick"].join("Ann", 100)
+    registry["quick"].join_many(["Bob", "Cat"], 200)
+    registry["quick"].confirm("Ann")
+    registry["long"].join("Ann", 300)
+    expected = state(registry)
+    log.close()
+    assert (tmp_path / "class_queue.log").read_bytes() == b""
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
+    assert registry.locate("Ann") is registry["long"]
+
+
+def test_recover_after_crash(tmp_path):
+    log, registry = open_log(tmp_path)
+    registry["quick"].join("Ann", 100)
+    registry["quick"].confirm("Ann")
+    registry["quick"].join("Ann", 200)
+    expected = state(registry)
+    crash(log)
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
+    assert registry["quick"].waiting.get_queue()[0].questions == 1
+
+
+def test_torn_record_is_dropped(tmp_path):
+    log, registry = open_log(tmp_path)
+    registry["quick"].join("Ann", 100)
+    expected = state(registry)
+    crash(log)
+    path = tmp_path / "class_queue.log"
+    complete = path.read_bytes()
+    with open(path, "ab") as file:
+        file.write(b'[2,"join","quick","Bo')
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
+    # The torn record is cut off so the next records follow the last complete one.
+    assert path.read_bytes() == complete
+    registry["quick"].join("Bob", 200)
+    crash(log)
+    log, registry = open_log(tmp_path)
+    assert [entry.name for entry in registry["quick"].waiting.get_queue()] == ["Ann", "Bob"]
+
+
+def test_torn_batch_is_dropped(tmp_path):
+    log, registry = open_log(tmp_path)
+    registry["quick"].join("Ann", 100)
+    expected = state(registry)
+    registry["quick"].join_many(["Bob", "Cat", "Dan"], 200)
+    crash(log)
+    path = tmp_path / "class_queue.log"
+    lines = path.read_bytes().splitlines(keepends=True)
+    assert json.loads(lines[1])[1] == "batch"
+    # Only part of the batch reached the disk, so none of it is replayed.
+    path.write_bytes(b"".join(lines[:-1]))
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
+    assert path.read_bytes() == lines[0]
+
+
+def test_snapshot_overlapping_log_is_not_replayed_twice(tmp_path):
+    log, registry = open_log(tmp_path)
+    registry["quick"].join("Ann", 100)
+    registry["quick"].confirm("Ann")
+    registry["quick"].join("Bob", 200)
+    path = tmp_path / "class_queue.log"
+    logged = path.read_bytes()
+    log.snapshot()
+    # A crash after the snapshot replaced the previous one but before the log was emptied.
+    with open(path, "ab") as file:
+        file.write(logged)
+    registry["quick"].join("Ann", 300)
+    expected = state(registry)
+    crash(log)
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
+    assert registry["quick"].history.count("Ann") == 1
+
+
+def test_periodic_snapshots(tmp_path):
+    log, registry = open_log(tmp_path, snapshot_period=3)
+    for i, name in enumerate(["Ann", "Bob", "Cat", "Dan", "Eve", "Fay", "Gus"]):
+        registry["quick"].join(name, i)
+        registry["quick"].confirm(name)
+    registry["long"].join("Hal", 10)
+    expected = state(registry)
+    crash(log)
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
+
+
+def test_snapshot_appends_only_new_history(tmp_path):
+    log, registry = open_log(tmp_path)
+    history_path = tmp_path / "class_queue.log.history"
+    registry["quick"].join("Ann", 100)
+    registry["quick"].confirm("Ann")
+    log.snapshot()
+    registry["long"].join("Bob", 200)
+    registry["long"].confirm("Bob")
+    log.snapshot()
+    log.snapshot()
+    entries = [json.loads(line) for line in history_path.read_bytes().splitlines()]
+    assert entries == [["quick", "Ann", 0, 100], ["long", "Bob", 0, 200]]
+    snapshot = json.loads((tmp_path / "class_queue.log.snapshot").read_text())
+    assert snapshot["history"] == history_path.stat().st_size
+    assert all("history" not in queue for queue in snapshot["queues"].values())
+
+
+def test_history_beyond_snapshot_is_ignored(tmp_path):
+    log, registry = open_log(tmp_path)
+    registry["quick"].join("Ann", 100)
+    registry["quick"].confirm("Ann")
+    log.snapshot()
+    registry["quick"].join("Ann", 200)
+    registry["quick"].confirm("Ann")
+    expected = state(registry)
+    crash(log)
+    history_path = tmp_path / "class_queue.log.history"
+    covered = history_path.read_bytes()
+    # A crash after a snapshot appended to the history file, with its last entry torn, but before it replaced
+    # the previous snapshot: the log still holds the accept, which is replayed instead.
+    with open(history_path, "ab") as file:
+        file.write(b'["quick","Ann",1,200]\n["quick","Bo')
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
+    assert registry["quick"].history.count("Ann") == 2
+    assert history_path.read_bytes() == covered
+    log.close()
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
+
+
+def test_snapshot_with_history_inside(tmp_path):
+    # Snapshots written before the history file held the accepted requests themselves.
+    snapshot = {"sequence": 5, "queues": {"quick": {"waiting": [["Bob", 0, 300]], "history": [["Ann", 0, 100]]},
+                                           "long": {"waiting": [], "history": []}}}
+    (tmp_path / "class_queue.log.snapshot").write_text(json.dumps(snapshot))
+    log, registry = open_log(tmp_path)
+    assert registry["quick"].history.count("Ann") == 1
+    assert registry.locate("Bob") is registry["quick"]
+    expected = state(registry)
+    log.close()
+    log, registry = open_log(tmp_path)
+    assert state(registry) == expected
@@ -0,0 +1,159 @@
+"""
+Tests of the queue server, run against loopback-only clients.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+
+from queue_core import AlreadyQueuedError, InAnotherQueueError, QuestionQueue, QueueRegistry
+from queue_server import QueueClient, QueueServer, RemoteQuestionQueue
+
+
+# ------ Fixtures ------ #
+
+
+@pytest.fixture
+def server():
+    """
+    Run a queue server for the quick and long queues on a free loopback port in a background event loop.
+    """
+    registry = QueueRegistry([QuestionQueue("quick"), QuestionQueue("long")])
+    queue_server = QueueServer(registry, "127.0.0.1", 0)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(queue_server.start(), loop).result(5)
+    yield queue_server
+    asyncio.run_coroutine_threadsafe(queue_server.close(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+def connect(server):
+    """
+    Connect a client mirroring the queues of the server, as a terminal does.
+    :param server (QueueServer): The server
+    :return (tuple): The client and the registry of its mirrored queues
+    """
+    client = QueueClient("127.0.0.1", server.port, timeout=5)
+    registry = QueueRegistry(RemoteQuestionQueue(name, client) for name in server.queues)
+    client.sync()
+    return client, registry
+
+
+def settle(client):
+    """
+    Wait until the client has received every event sent before now, then apply them to its mirrors.
+    The server answers the requests of a client in order, after the events it sent earlier.
+    :param client (QueueClient): The client
+    """
+    client.exchange("state")
+    client.drain()
+
+
+def names(queue):
+    """
+    Return the names waiting in a question queue in order.
+    :param queue (QuestionQueue): The question queue
+    :return (list): The names
+    """
+    return [name for name, questions, start_time in queue.waiting.get_queue()]
+
+
+# ------ Tests ------ #
+
+
+def test_join_cancel_confirm(server):
+    client, registry = connect(server)
+    quick = registry["quick"]
+    assert quick.join("Ann").name == "Ann"
+    quick.join("Bob")
+    assert names(quick) == ["Ann", "Bob"] == names(server.queues["quick"])
+    assert quick.confirm("Ann").name == "Ann"
+    assert quick.cancel("Bob").name == "Bob"
+    assert quick.cancel("Bob") is None
+    assert names(quick) == [] == names(server.queues["quick"])
+    assert server.queues["quick"].history.count("Ann") == 1
+    quick.join("Ann")
+    assert quick.waiting.get_queue()[0][1] == 1
+    client.close()
+
+
+def test_queue_errors(server):
+    client, registry = connect(server)
+    registry["quick"].join("Ann")
+    with pytest.raises(AlreadyQueuedError):
+        registry["quick"].join("Ann")
+    with pytest.raises(InAnotherQueueError) as error:
+        registry["long"].join("Ann")
+    assert error.value.queue is registry["quick"]
+    client.close()
+
+
+def test_batches(server):
+    client, registry = connect(server)
+    quick = registry["quick"]
+    assert [recipient.name for recipient in quick.join_many(["Ann", "Bob", "Cat", "Dan"])] == \
+        ["Ann", "Bob", "Cat", "Dan"]
+    with pytest.raises(AlreadyQueuedError):
+        quick.join_many(["Eve", "Bob"])
+    assert "Eve" not in server.queues["quick"].waiting
+    assert [recipient.name for recipient in quick.confirm_many(["Bob", "Dan", "Zed"])] == ["Bob", "Dan"]
+    assert [recipient.name for recipient in quick.cancel_many(["Ann"])] == ["Ann"]
+    assert names(quick) == ["Cat"] == names(server.queues["quick"])
+    assert [recipient.name for recipient in quick.clear()] == ["Cat"]
+    assert names(quick) == [] == names(server.queues["quick"])
+    assert server.queues["quick"].history.count("Bob") == 1
+    client.close()
+
+
+def test_mirrors_stay_in_sync(server):
+    first, first_registry = connect(server)
+    first_registry["quick"].join_many(["Ann", "Bob"])
+    # A client connecting later starts from the state of the server.
+    second, second_registry = connect(server)
+    assert names(second_registry["quick"]) == ["Ann", "Bob"]
+    second_registry["quick"].confirm("Ann")
+    second_registry["long"].join("Cat")
+    first_registry["quick"].cancel_many(["Bob"])
+    settle(first)
+    settle(second)
+    for registry in (first_registry, second_registry):
+        assert names(registry["quick"]) == [] and names(registry["long"]) == ["Cat"]
+        assert registry["quick"].history.count("Ann") == 1
+    with pytest.raises(InAnotherQueueError):
+        first_registry["quick"].join("Cat")
+    first.close()
+    second.close()
+
+
+@pytest.mark.parametrize("request_", [
+    [1, 2],
+    {"id": 1, "op": "join", "queue": "quick"},
+    {"id": 1, "op": "join", "queue": "quick", "name": ["Ann"]},
+    {"id": 1, "op": "join", "queue": "quick", "name": None},
+    {"id": 1, "op": "join", "queue": "quick", "name": ""},
+    {"id": 1, "op": "join", "queue": "quick", "name": "R2D2"},
+    {"id": 1, "op": "join_many", "queue": "quick"},
+    {"id": 1, "op": "join_many", "queue": "quick", "names": "abc"},
+    {"id": 1, "op": "join", "queue": "marking", "name": "Ann"},
+    {"id": 1, "op": "leave", "queue": "quick", "name": "Ann"},
+])
+def test_bad_request(server, request_):
+    with socket.create_connection(("127.0.0.1", server.port), timeout=5) as connection:
+        connection.sendall(json.dumps(request_).encode("utf-8") + b"\n")
+        reply = json.loads(connection.makefile("rb").readline())
+    assert reply["ok"] is False and reply["error"] == "BadRequest"
+    assert all(len(queue.waiting) == 0 for queue in server.queues.values())
+
+
+def test_bad_request_raises_on_the_client(server):
+    client, registry = connect(server)
+    with pytest.raises(ValueError):
+        registry["quick"].join("Ann 2")
+    client.close()